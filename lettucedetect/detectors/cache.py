@@ -1,4 +1,4 @@
-"""Thread‑safe JSON cache with SHA‑256 keys."""
+"""Thread‑safe JSON Lines cache with SHA‑256 keys."""
 
 from __future__ import annotations
 
@@ -10,20 +10,53 @@ from typing import Any
 
 
 class CacheManager:
-    """Disk‑backed cache for expensive LLM calls."""
+    """Disk‑backed cache for expensive LLM calls.
+
+    Entries are appended to the file as one ``[key, value]`` JSON array per line, so storing an
+    entry costs the same however large the cache grows.
+    """
 
     def __init__(self, file_path: str | Path):
         self.path = Path(file_path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._lock = threading.Lock()
-        self._data: dict[str, Any] = (
-            json.loads(self.path.read_text("utf-8")) if self.path.exists() else {}
-        )
+        self._data: dict[str, Any] = self._load()
 
     @staticmethod
     def _hash(*parts: str) -> str:
         return hashlib.sha256("||".join(parts).encode()).hexdigest()
 
+    @staticmethod
+    def _line(key: str, value: Any) -> str:
+        return json.dumps([key, value], ensure_ascii=False) + "\n"
+
+    def _load(self) -> dict[str, Any]:
+        """Read the cache file, converting a cache stored as a single JSON object in place."""
+        if not self.path.exists():
+            return {}
+        text = self.path.read_text("utf-8")
+        if text.lstrip().startswith("{"):
+            data = json.loads(text)
+            self.path.write_text(
+                "".join(self._line(key, value) for key, value in data.items()), encoding="utf-8"
+            )
+            return data
+
+        if text and not text.endswith("\n"):
+            # Terminate a partially written last line so new entries start on their own line.
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write("\n")
+
+        data = {}
+        for line in text.splitlines():
+            try:
+                key, value = json.loads(line)
+            except (json.JSONDecodeError, ValueError, TypeError):
+                # Blank, partially written (e.g. from an interrupted run) or malformed line.
+                continue
+            data[key] = value
+        return data
+
     def get(self, key: str) -> Any | None:
         with self._lock:
             return self._data.get(key)
@@ -31,4 +64,5 @@ class CacheManager:
     def set(self, key: str, value: Any) -> None:
         with self._lock:
             self._data[key] = value
-            self.path.write_text(json.dumps(self._data, ensure_ascii=False), encoding="utf-8")
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(self._line(key, value))
@@ -2,30 +2,33 @@
 
 from __future__ import annotations
 
+from importlib import import_module
+
 from lettucedetect.detectors.base import BaseDetector
 
 __all__ = ["make_detector"]
 
+# Detector module and class per method. Modules are imported on first use so that a method's
+# dependencies are only needed when it is picked.
+_DETECTORS = {
+    "transformer": ("lettucedetect.detectors.transformer", "TransformerDetector"),
+    "sentencetransformer": ("lettucedetect.detectors.sentence_transformer", "SentenceTransformer"),
+    "llm": ("lettucedetect.detectors.llm", "LLMDetector"),
+}
+
 
 def make_detector(method: str, **kwargs) -> BaseDetector:
     """Create a detector of the requested type with the given parameters.
 
-    :param method: One of "transformer" or "llm".
+    :param method: One of "transformer", "sentencetransformer" or "llm".
     :param kwargs: Passed to the concrete detector constructor.
     :return: A concrete detector instance.
-    :raises ValueError: If method is not one of "transformer" or "llm".
+    :raises ValueError: If method is not one of "transformer", "sentencetransformer" or "llm".
     """
-    if method == "transformer":
-        from lettucedetect.detectors.transformer import TransformerDetector
-
-        return TransformerDetector(**kwargs)
-    elif method == "sentencetransformer":
-        from lettucedetect.detectors.sentence_transformer import SentenceTransformer
-
-        return SentenceTransformer(**kwargs)
-    elif method == "llm":
-        from lettucedetect.detectors.llm import LLMDetector
-
-        return LLMDetector(**kwargs)
-    else:
-        raise ValueError(f"Unknown detector method: {method}. Use one of: transformer, llm")
+    try:
+        module, name = _DETECTORS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown detector method: {method}. Use one of: {', '.join(_DETECTORS)}"
+        ) from None
+    return getattr(import_module(module), name)(**kwargs)
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import json
 import os
-import re
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from string import Template
@@ -45,6 +44,7 @@ class LLMDetector:
         fewshot_path: str | None = None,
         prompt_path: str | None = None,
         cache_file: str | None = None,
+        max_workers: int = 30,
     ):
         """Initialize the LLMDetector.
 
@@ -55,6 +55,7 @@ class LLMDetector:
         :param fewshot_path: The path to the few-shot examples.
         :param prompt_path: The path to the prompt.
         :param cache_file: The path to the cache file.
+        :param max_workers: The maximum number of concurrent requests in ``predict_prompt_batch``.
         """
         if lang not in LANG_TO_PASSAGE:
             raise ValueError(f"Invalid language. Use one of: {', '.join(LANG_TO_PASSAGE.keys())}")
@@ -63,6 +64,7 @@ class LLMDetector:
         self.temperature = temperature
         self.lang = lang
         self.zero_shot = zero_shot
+        self.max_workers = max_workers
 
         # Load few-shot examples
         if fewshot_path is None:
@@ -80,7 +82,25 @@ class LLMDetector:
         template_path = Path(prompt_path)
         if not template_path.exists():
             raise FileNotFoundError(f"Prompt template not found at {template_path}")
-        self.template = Template(template_path.read_text(encoding="utf-8"))
+        template = template_path.read_text(encoding="utf-8")
+
+        # The instructions and few-shot examples before the first per-sample placeholder are the
+        # same for every call. They are rendered once and sent as the system message, so that
+        # the provider's prompt caching can reuse them; only source and answer go in the user turn.
+        placeholder = min(
+            (template.find(key) for key in ("${context}", "${answer}") if key in template),
+            default=len(template),
+        )
+        # Cut at the blank line before it, so the <source> tag stays with the sample.
+        blank_line = template.rfind("\n\n", 0, placeholder)
+        split = blank_line if blank_line > 0 else placeholder
+        # Values of the placeholders that do not change per call, rendered once.
+        self._static_fields = {
+            "lang": PromptUtils.get_full_language_name(self.lang),
+            "fewshot_block": self._fewshot_block(),
+        }
+        self.system_prompt = Template(template[:split]).substitute(self._static_fields)
+        self.user_template = Template(template[split:])
 
         # Set up cache
         if cache_file is None:
@@ -95,7 +115,11 @@ class LLMDetector:
 
         self.cache = CacheManager(cache_file)
 
-    def _openai(self) -> OpenAI:
+        # One client for all calls, its connection pool is shared by the batch threads.
+        self.client = self._openai()
+
+    @staticmethod
+    def _openai() -> OpenAI:
         return OpenAI(
             api_key=os.getenv("OPENAI_API_KEY") or "EMPTY",
             base_url=os.getenv("OPENAI_API_BASE") or "https://api.openai.com/v1",
@@ -116,20 +140,13 @@ class LLMDetector:
         return "\n".join(lines)
 
     def _build_prompt(self, context: str, answer: str) -> str:
-        """Fill the template with runtime values, inserting few-shot examples.
+        """Fill the per-sample part of the template with runtime values.
 
         :param context: The context string.
         :param answer: The answer string.
-        :return: The filled template.
+        :return: The filled template, without the static part in ``self.system_prompt``.
         """
-        language_name = PromptUtils.get_full_language_name(self.lang)
-
-        return self.template.substitute(
-            lang=language_name,
-            context=context,
-            answer=answer,
-            fewshot_block=self._fewshot_block(),
-        )
+        return self.user_template.substitute(self._static_fields, context=context, answer=answer)
 
     @staticmethod
     def _to_spans(substrs: list[str], answer: str) -> list[dict]:
@@ -143,10 +160,10 @@ class LLMDetector:
         for sub in substrs:
             if not sub:
                 continue
-            # Use regex for more reliable matching
-            match = re.search(re.escape(sub), answer)
-            if match:
-                spans.append({"start": match.start(), "end": match.end(), "text": sub})
+            # Plain substring search, the first occurrence is the span.
+            start = answer.find(sub)
+            if start != -1:
+                spans.append({"start": start, "end": start + len(sub), "text": sub})
         return spans
 
     def _predict(self, prompt: str, answer: str) -> list[dict]:
@@ -156,23 +173,26 @@ class LLMDetector:
         :param answer: The answer string.
         :returns: List of spans.
         """
-        # Build the full LLM prompt using the template
+        # Build the per-sample part of the LLM prompt using the template
         llm_prompt = self._build_prompt(prompt, answer)
 
         # Use the full LLM prompt for cache key calculation
-        cache_key = self.cache._hash(llm_prompt, self.model, str(self.temperature))
+        cache_key = self.cache._hash(
+            self.system_prompt + llm_prompt, self.model, str(self.temperature)
+        )
 
         cached = self.cache.get(cache_key)
         if cached is None:
-            resp = self._openai().chat.completions.create(
+            resp = self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert in detecting hallucinations in LLM outputs.",
+                        "content": "You are an expert in detecting hallucinations in LLM outputs."
+                        f"\n\n{self.system_prompt}",
                     },
-                    # Use the full LLM prompt here, not the raw context
-                    {"role": "user", "content": llm_prompt},
+                    # Only the source and answer change between calls
+                    {"role": "user", "content": llm_prompt.lstrip()},
                 ],
                 tools=ANNOTATE_SCHEMA,
                 tool_choice={"type": "function", "function": {"name": "annotate"}},
@@ -235,6 +255,6 @@ class LLMDetector:
         if output_format != "spans":
             raise ValueError("LLMDetector only supports 'spans' output_format.")
 
-        with ThreadPoolExecutor(max_workers=30) as pool:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
             futs = [pool.submit(self._predict, p, a) for p, a in zip(prompts, answers)]
             return [f.result() for f in futs]
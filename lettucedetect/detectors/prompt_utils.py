@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 from string import Template
 
@@ -36,9 +37,12 @@ class PromptUtils:
     """Utility class for loading and formatting prompts."""
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def load_prompt(filename: str) -> Template:
         """Load a prompt template from the prompts directory.
 
+        Templates are read from disk once and then served from memory.
+
         :param filename: Name of the prompt file
         :return: Template object for the prompt
         :raises FileNotFoundError: If the prompt file doesn't exist
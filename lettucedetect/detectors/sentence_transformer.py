@@ -76,17 +76,15 @@ class SentenceTransformer(BaseDetector):
             attention_mask = attention_mask.unsqueeze(0).to(self.device)
 
             # Run model inference
-            with torch.no_grad():
+            with torch.inference_mode():
                 outputs = self.model(input_ids, attention_mask, [sentence_boundaries])
-            # print(outputs)
-            # Extract hallucinated sentences
-            hallucinated_sentences = []
-            # print(outputs)
-            if len(outputs) > 0 and outputs[0] is not None and len(outputs[0]) > 0:
-                sentence_preds = torch.nn.functional.softmax(outputs[0], dim=1)
-                for i, pred in enumerate(sentence_preds):
-                    if i < len(sentences) and pred[1] > self.threshold:
-                        hallucinated_sentences.append(sentences[i])
+                # Extract hallucinated sentences
+                hallucinated_sentences = []
+                if len(outputs) > 0 and outputs[0] is not None and len(outputs[0]) > 0:
+                    sentence_preds = torch.nn.functional.softmax(outputs[0], dim=1)
+                    for i, pred in enumerate(sentence_preds):
+                        if i < len(sentences) and pred[1] > self.threshold:
+                            hallucinated_sentences.append(sentences[i])
 
             return hallucinated_sentences
         else:
@@ -2,39 +2,242 @@
 
 from __future__ import annotations
 
+import importlib.util
+import logging
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
 import torch
+from torch.utils.data import DataLoader
 from transformers import AutoModelForTokenClassification, AutoTokenizer
 
-from lettucedetect.datasets.hallucination_dataset import HallucinationDataset
 from lettucedetect.detectors.base import BaseDetector
 from lettucedetect.detectors.prompt_utils import LANG_TO_PASSAGE, Lang, PromptUtils
 
+if TYPE_CHECKING:
+    import onnxruntime
+
 __all__ = ["TransformerDetector"]
 
+logger = logging.getLogger(__name__)
+
+
+def _encode_pairs(
+    tokenizer: AutoTokenizer,
+    max_length: int,
+    padding: bool | str,
+    batch: tuple[list[str], list[str]],
+) -> dict[str, torch.Tensor]:
+    """Tokenize a batch of prompt/answer pairs and locate the start of each answer.
+
+    Defined at module level so that DataLoader worker processes can run it.
+
+    :param tokenizer: The tokenizer to use.
+    :param max_length: Maximum input sequence length; prompts are truncated to fit.
+    :param padding: Padding strategy passed to the tokenizer.
+    :param batch: The prompts and the answers of the batch.
+    :return: The input ids, attention mask and offset mapping, plus the index of the first
+        answer token of every pair under "answer_start".
+    """
+    prompts, answers = batch
+    encoding = tokenizer(
+        prompts,
+        answers,
+        padding=padding,
+        truncation="only_first",
+        max_length=max_length,
+        return_offsets_mapping=True,
+        return_tensors="pt",
+    )
+    # The answer starts at the first token of the second sequence.
+    answer_starts = []
+    for i in range(len(prompts)):
+        sequence_ids = encoding.sequence_ids(i)
+        answer_starts.append(sequence_ids.index(1) if 1 in sequence_ids else len(sequence_ids))
+    return {
+        "input_ids": encoding["input_ids"],
+        "attention_mask": encoding["attention_mask"],
+        "offset_mapping": encoding["offset_mapping"],
+        "answer_start": torch.tensor(answer_starts),
+    }
+
 
 class TransformerDetector(BaseDetector):
     """Detect hallucinations with a fine‑tuned token classifier."""
 
     def __init__(
-        self, model_path: str, max_length: int = 4096, device=None, lang: Lang = "en", **tok_kwargs
+        self,
+        model_path: str,
+        max_length: int = 4096,
+        device=None,
+        lang: Lang = "en",
+        batch_size: int = 8,
+        num_workers: int = 0,
+        backend: str = "torch",
+        onnx_path: str | None = None,
+        compile_model: bool = False,
+        dtype: torch.dtype | None = None,
+        attn_implementation: str | None = None,
+        **tok_kwargs,
     ):
         """Initialize the transformer detector.
 
         :param model_path: Path to the pre-trained model.
         :param max_length: Maximum length of the input sequence.
-        :param device: Device to use for inference.
+        :param device: Device to use for inference, as a ``torch.device`` or a string such as
+            "cpu" or "cuda:0". Defaults to CUDA when it is available.
         :param lang: Language of the model.
+        :param batch_size: Number of inputs per forward pass in ``predict_prompt_batch``.
+        :param num_workers: Number of DataLoader worker processes that tokenize the next batches
+            of ``predict_prompt_batch`` while the model runs. 0 tokenizes in the main process.
+            Workers are started on every call, so they only pay off for calls with many batches,
+            not when ``predict_prompt_batch`` is called repeatedly with a few inputs.
+        :param backend: "torch" to run the PyTorch model, or "ort" to run it with ONNX Runtime
+            (requires the ``onnx`` extra, or ``onnxruntime-gpu`` for the CUDA provider).
+        :param onnx_path: ONNX file used by the "ort" backend. The model is exported there if
+            the file does not exist yet; defaults to a temporary file that is removed with the
+            detector.
+        :param compile_model: If True, compile the model with ``torch.compile`` into CUDA graphs.
+            Inputs are then padded to ``max_length`` and smaller batches are filled up to
+            ``batch_size``, so every forward has the same shape. This pays off for short-input,
+            latency-bound workloads.
+        :param dtype: Precision of the model weights and autocast with the "torch" backend.
+            Defaults to bfloat16 (or float16 on GPUs without bfloat16) on CUDA, float32 otherwise.
+            The "ort" backend runs the float32 export.
+        :param attn_implementation: Attention kernel of the model, e.g. "flash_attention_2" if
+            flash-attn is installed. Defaults to the choice of transformers, which uses "sdpa"
+            where the model supports it and falls back to "eager" otherwise.
         :param tok_kwargs: Additional keyword arguments for the tokenizer.
         """
         if lang not in LANG_TO_PASSAGE:
             raise ValueError(f"Invalid language. Choose from {', '.join(LANG_TO_PASSAGE)}")
+        if backend not in ("torch", "ort"):
+            raise ValueError("Invalid backend. Choose from torch, ort")
         self.lang, self.max_length = lang, max_length
+        self.batch_size, self.num_workers = batch_size, num_workers
         self.tokenizer = AutoTokenizer.from_pretrained(model_path, **tok_kwargs)
-        self.model = AutoModelForTokenClassification.from_pretrained(model_path, **tok_kwargs)
-        self.device = device or (
-            torch.device("cuda") if torch.cuda.is_available() else torch.device("cpu")
+        model_kwargs = dict(tok_kwargs)
+        if attn_implementation is not None:
+            model_kwargs["attn_implementation"] = attn_implementation
+        self.model = AutoModelForTokenClassification.from_pretrained(model_path, **model_kwargs)
+        self.device = (
+            torch.device(device)
+            if device is not None
+            else torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        )
+        if dtype is None:
+            dtype = torch.float32
+            if self.device.type == "cuda" and backend == "torch":
+                dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float16
+        self.dtype = dtype
+        self.model.eval()
+        if backend == "ort":
+            # ONNX Runtime holds its own copy of the weights, so the PyTorch model stays on the
+            # CPU and is only used to export it.
+            self.session = self._load_ort_session(onnx_path)
+        else:
+            self.model.to(self.device, dtype=self.dtype)
+            self.session = None
+        # ONNX Runtime reads its inputs from host arrays, so they are not moved to the GPU.
+        self._input_device = self.device if self.session is None else torch.device("cpu")
+        self.compiled = False
+        if compile_model:
+            self._compile()
+
+    def _compile(self) -> None:
+        """Compile the model for static shapes and capture it with a few warmup passes.
+
+        The model stays in eager mode with the "ort" backend, or on CUDA without Triton.
+        """
+        if self.session is not None:
+            logger.warning("compile_model has no effect with the 'ort' backend")
+            return
+        if self.device.type == "cuda" and importlib.util.find_spec("triton") is None:
+            logger.warning("Triton is not available, running the model in eager mode")
+            return
+
+        torch.set_float32_matmul_precision("high")
+        self.model = torch.compile(
+            self.model, mode="reduce-overhead", fullgraph=True, dynamic=False
         )
-        self.model.to(self.device).eval()
+        self.compiled = True
+
+        # Capture the graph now rather than on the first prediction. The warmup runs full batches
+        # through the prediction path, so its inputs match those of predictions.
+        prompts = answers = ["warmup"] * self.batch_size
+        encoding = self._encoder()((prompts, answers))
+        for _ in range(3):
+            self._predict_encoded(encoding, answers, "tokens")
+
+    def export_onnx(self, path: str) -> None:
+        """Export the token classifier to ONNX, with dynamic batch and sequence axes.
+
+        :param path: Where to write the ``.onnx`` file.
+        """
+        dummy = self.tokenizer("export", return_tensors="pt").to(self.model.device)
+        dynamic_axes = {
+            name: {0: "batch", 1: "sequence"} for name in ("input_ids", "attention_mask", "logits")
+        }
+        with torch.no_grad():
+            torch.onnx.export(
+                self.model,
+                (dummy["input_ids"], dummy["attention_mask"]),
+                path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                dynamo=False,
+            )
+
+    def _load_ort_session(self, onnx_path: str | None) -> onnxruntime.InferenceSession:
+        """Create an ONNX Runtime session for the model, exporting it first if needed.
+
+        :param onnx_path: Path of the ONNX file, or None to export to a temporary file.
+        :return: An ``onnxruntime.InferenceSession``.
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "The 'ort' backend requires onnxruntime. Install it with: "
+                "pip install lettucedetect[onnx]"
+            ) from e
+
+        if onnx_path is None:
+            # Kept on the detector, so the export is deleted once the detector is.
+            self._onnx_dir = tempfile.TemporaryDirectory()
+            onnx_path = str(Path(self._onnx_dir.name) / "model.onnx")
+        if not Path(onnx_path).exists():
+            self.export_onnx(onnx_path)
+
+        providers = ["CPUExecutionProvider"]
+        if self.device.type == "cuda":
+            providers.insert(0, "CUDAExecutionProvider")
+        return ort.InferenceSession(onnx_path, providers=providers)
+
+    def _forward(self, encoding: dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run the token classifier on an encoded batch.
+
+        :param encoding: The "input_ids" and "attention_mask" tensors, on the detector's device
+            (on the CPU for the "ort" backend).
+        :return: The float32 logits, shape [batch_size, seq_len, num_labels], on the same device
+            as the inputs.
+        """
+        if self.session is None:
+            with torch.autocast(
+                device_type=self.device.type,
+                dtype=self.dtype,
+                enabled=self.dtype != torch.float32,
+            ):
+                # Probabilities are computed in float32 from the half-precision logits.
+                return self.model(**encoding).logits.float()
+
+        ort_inputs = {name: encoding[name].numpy() for name in ("input_ids", "attention_mask")}
+        (logits,) = self.session.run(["logits"], ort_inputs)
+        return torch.from_numpy(logits)
 
     def _predict(self, prompt: str, answer: str, output_format: str) -> list:
         """Predict hallucination tokens or spans from the provided prompt and answer.
@@ -43,104 +246,175 @@ class TransformerDetector(BaseDetector):
         :param answer: The answer string.
         :param output_format: "tokens" to return token-level predictions, or "spans" to return grouped spans.
         """
-        # Use the shared tokenization logic from HallucinationDataset
-        encoding, _, offsets, answer_start_token = HallucinationDataset.prepare_tokenized_input(
-            self.tokenizer, prompt, answer, self.max_length
+        return self._predict_batch([prompt], [answer], output_format)[0]
+
+    def _predict_batch(self, prompts: list[str], answers: list[str], output_format: str) -> list:
+        """Predict hallucination tokens or spans for several prompts and answers in one forward pass.
+
+        :param prompts: List of prompt strings.
+        :param answers: List of answer strings.
+        :param output_format: "tokens" to return token-level predictions, or "spans" to return grouped spans.
+        :return: One list of predictions per input, in the input order.
+        """
+        encoding = self._encoder()((prompts, answers))
+        if self._input_device.type == "cuda":
+            # Page-locked inputs let the copies to the GPU run asynchronously, as the
+            # DataLoader in predict_prompt_batch does with pin_memory.
+            for key in ("input_ids", "attention_mask"):
+                encoding[key] = encoding[key].pin_memory()
+        return self._predict_encoded(encoding, answers, output_format)
+
+    def _encoder(self) -> partial:
+        """Return the function that tokenizes a (prompts, answers) batch, see :func:`_encode_pairs`.
+
+        It only holds the tokenizer, so it can be sent to DataLoader worker processes.
+        """
+        return partial(
+            _encode_pairs,
+            self.tokenizer,
+            self.max_length,
+            # A compiled model replays graphs captured for a fixed sequence length.
+            "max_length" if self.compiled else True,
         )
 
-        # Create a label tensor: mark tokens before answer as -100 (ignored) and answer tokens as 0.
-        labels = torch.full_like(encoding.input_ids[0], -100, device=self.device)
-        labels[answer_start_token:] = 0
-        # Move encoding to the device
-        encoding = {
-            key: value.to(self.device)
-            for key, value in encoding.items()
-            if key in ["input_ids", "attention_mask", "labels"]
+    @torch.inference_mode()
+    def _predict_encoded(
+        self, encoding: dict[str, torch.Tensor], answers: list[str], output_format: str
+    ) -> list:
+        """Run the model on a tokenized batch and turn its predictions into tokens or spans.
+
+        :param encoding: A batch returned by :meth:`_encoder`.
+        :param answers: The answer strings of the batch.
+        :param output_format: "tokens" to return token-level predictions, or "spans" to return grouped spans.
+        :return: One list of predictions per input, in the batch order.
+        """
+        if output_format not in ("tokens", "spans"):
+            raise ValueError("Invalid output_format. Use 'tokens' or 'spans'.")
+
+        offsets = encoding["offset_mapping"]
+        # Every token from the answer start up to the last non-padding one (the closing special
+        # token included) is predicted.
+        answer_starts = encoding["answer_start"]
+        seq_len = encoding["attention_mask"].size(1)
+        answer_ends = seq_len - encoding["attention_mask"].flip(-1).argmax(-1)
+
+        # Inputs without answer tokens (e.g. empty answers) have nothing to predict, so they
+        # are left out of the forward pass.
+        results: list = [[] for _ in answers]
+        has_answer = answer_starts < answer_ends
+        if not has_answer.any():
+            return results
+        rows = has_answer.nonzero().squeeze(-1).tolist()
+        inputs = {
+            key: (encoding[key] if has_answer.all() else encoding[key][rows]).to(
+                self._input_device, non_blocking=True
+            )
+            for key in ("input_ids", "attention_mask")
         }
 
+        num_rows = len(rows)
+        if self.compiled and num_rows < self.batch_size:
+            # The graphs were captured for full batches, so fill the batch up with copies of the
+            # first input and drop their logits.
+            inputs = {
+                key: torch.cat([value, value[:1].expand(self.batch_size - num_rows, -1)])
+                for key, value in inputs.items()
+            }
+
         # Run model inference
-        with torch.no_grad():
-            outputs = self.model(**encoding)
-        logits = outputs.logits
-        token_preds = torch.argmax(logits, dim=-1)[0]
-        probabilities = torch.softmax(logits, dim=-1)[0]
-
-        # Mask out predictions for context tokens.
-        token_preds = torch.where(labels == -100, labels, token_preds)
-
-        if output_format == "tokens":
-            # return token probabilities for each token (with the tokens as well, if not -100)
-            token_probs = []
-            input_ids = encoding["input_ids"][0]  # Get the input_ids tensor from the encoding dict
-            for i, (token, pred, prob) in enumerate(zip(input_ids, token_preds, probabilities)):
-                if not labels[i].item() == -100:
-                    token_probs.append(
-                        {
-                            "token": self.tokenizer.decode([token]),
-                            "pred": pred.item(),
-                            "prob": prob[1].item(),  # Get probability for class 1 (hallucination)
-                        }
-                    )
-            return token_probs
-        elif output_format == "spans":
-            # Compute the answer's character offset (the first token of the answer).
-            if answer_start_token < offsets.size(0):
-                answer_char_offset = offsets[answer_start_token][0].item()
-            else:
-                answer_char_offset = 0
-
-            spans: list[dict] = []
-            current_span: dict | None = None
-
-            # Iterate over tokens in the answer region.
-            for i in range(answer_start_token, token_preds.size(0)):
-                # Skip tokens marked as ignored.
-                if labels[i].item() == -100:
-                    continue
-
-                token_start, token_end = offsets[i].tolist()
-                # Skip special tokens with zero length.
-                if token_start == token_end:
-                    continue
-
-                # Adjust offsets relative to the answer text.
-                rel_start = token_start - answer_char_offset
-                rel_end = token_end - answer_char_offset
-
-                is_hallucination = (
-                    token_preds[i].item() == 1
-                )  # assuming class 1 indicates hallucination.
-                confidence = probabilities[i, 1].item() if is_hallucination else 0.0
-
-                if is_hallucination:
-                    if current_span is None:
-                        current_span = {
-                            "start": rel_start,
-                            "end": rel_end,
-                            "confidence": confidence,
-                        }
-                    else:
-                        # Extend the current span.
-                        current_span["end"] = rel_end
-                        current_span["confidence"] = max(current_span["confidence"], confidence)
-                else:
-                    # If we were building a hallucination span, finalize it.
-                    if current_span is not None:
-                        # Extract the hallucinated text from the answer.
-                        span_text = answer[current_span["start"] : current_span["end"]]
-                        current_span["text"] = span_text
-                        spans.append(current_span)
-                        current_span = None
-
-            # Append any span still in progress.
-            if current_span is not None:
-                span_text = answer[current_span["start"] : current_span["end"]]
-                current_span["text"] = span_text
-                spans.append(current_span)
-
-            return spans
+        logits = self._forward(inputs)[:num_rows]
+        if logits.size(-1) == 2:
+            # For the binary head, softmax(logits)[..., 1] == sigmoid(logits[..., 1] - logits[..., 0])
+            # and the argmax is the sign of that margin.
+            margin = logits[..., 1] - logits[..., 0]
+            token_preds = (margin > 0).long().cpu()
+            probabilities = torch.sigmoid(margin).cpu()
         else:
-            raise ValueError("Invalid output_format. Use 'tokens' or 'spans'.")
+            token_preds = torch.argmax(logits, dim=-1).cpu()
+            # Probability of class 1 (hallucination) for every token.
+            probabilities = torch.softmax(logits, dim=-1)[..., 1].cpu()
+
+        for j, i in enumerate(rows):
+            answer_start = int(answer_starts[i])
+            answer_tokens = slice(answer_start, int(answer_ends[i]))
+
+            if output_format == "tokens":
+                results[i] = self._to_tokens(
+                    encoding["input_ids"][i, answer_tokens],
+                    token_preds[j, answer_tokens],
+                    probabilities[j, answer_tokens],
+                )
+            else:
+                # The answer's character offset is the start of its first token.
+                answer_char_offset = offsets[i, answer_start, 0].item()
+                results[i] = self._to_spans(
+                    answers[i],
+                    offsets[i, answer_tokens] - answer_char_offset,
+                    token_preds[j, answer_tokens],
+                    probabilities[j, answer_tokens],
+                )
+        return results
+
+    def _to_tokens(
+        self, input_ids: torch.Tensor, token_preds: torch.Tensor, probabilities: torch.Tensor
+    ) -> list[dict]:
+        """Build token-level predictions for the answer tokens of one input.
+
+        :param input_ids: The answer token ids.
+        :param token_preds: The predicted class of each answer token.
+        :param probabilities: The hallucination probability of each answer token.
+        :return: A dict with the decoded token, its prediction and probability per token.
+        """
+        # Decode every token on its own, but in a single tokenizer call.
+        tokens = self.tokenizer.batch_decode(input_ids.unsqueeze(-1).tolist())
+        return [
+            {
+                "token": token,
+                "pred": pred,
+                "prob": prob,
+            }
+            for token, pred, prob in zip(tokens, token_preds.tolist(), probabilities.tolist())
+        ]
+
+    @staticmethod
+    def _to_spans(
+        answer: str, offsets: torch.Tensor, token_preds: torch.Tensor, probabilities: torch.Tensor
+    ) -> list[dict]:
+        """Group consecutive hallucinated answer tokens into character spans.
+
+        :param answer: The answer string.
+        :param offsets: Character offsets of the answer tokens, relative to the answer text.
+        :param token_preds: The predicted class of each answer token.
+        :param probabilities: The hallucination probability of each answer token.
+        :return: The hallucinated spans with their text and maximum confidence.
+        """
+        offsets, token_preds, probabilities = (
+            offsets.numpy(),
+            token_preds.numpy(),
+            probabilities.numpy(),
+        )
+        # Special tokens have zero length; they neither start nor break a span.
+        keep = offsets[:, 0] != offsets[:, 1]
+        offsets, probabilities = offsets[keep], probabilities[keep]
+        is_hallucination = token_preds[keep] == 1  # assuming class 1 indicates hallucination.
+
+        # Runs of hallucinated tokens start where the mask rises and end where it falls.
+        edges = np.diff(is_hallucination.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if starts.size == 0:
+            return []
+
+        # The confidence of a span is the highest probability among its tokens.
+        confidences = np.maximum.reduceat(
+            np.where(is_hallucination, probabilities, -np.inf), starts
+        )
+        return [
+            {"start": start, "end": end, "confidence": confidence, "text": answer[start:end]}
+            for start, end, confidence in zip(
+                offsets[starts, 0].tolist(), offsets[ends - 1, 1].tolist(), confidences.tolist()
+            )
+        ]
 
     def predict(self, context, answer, question=None, output_format="tokens") -> list:
         """Predict hallucination tokens or spans from the provided context, answer, and question.
@@ -170,4 +444,31 @@ class TransformerDetector(BaseDetector):
         :param answers: List of answer strings.
         :param output_format: "tokens" to return token-level predictions, or "spans" to return grouped spans.
         """
-        return [self._predict(p, a, output_format) for p, a in zip(prompts, answers)]
+        # Run inputs of similar length together so batches carry little padding, then put the
+        # predictions back in the input order.
+        order = sorted(range(len(prompts)), key=lambda i: len(prompts[i]) + len(answers[i]))
+        batch_orders = [
+            order[start : start + self.batch_size]
+            for start in range(0, len(order), self.batch_size)
+        ]
+        # With workers, the next batches are tokenized while the model runs on the current one.
+        # They are started per call, and a single batch has nothing to overlap with.
+        loader = DataLoader(
+            [
+                ([prompts[i] for i in batch_order], [answers[i] for i in batch_order])
+                for batch_order in batch_orders
+            ],
+            batch_size=None,
+            num_workers=self.num_workers if len(batch_orders) > 1 else 0,
+            collate_fn=self._encoder(),
+            pin_memory=self._input_device.type == "cuda",
+        )
+
+        results: list = [None] * len(prompts)
+        for batch_order, encoding in zip(batch_orders, loader):
+            batch_results = self._predict_encoded(
+                encoding, [answers[i] for i in batch_order], output_format
+            )
+            for i, result in zip(batch_order, batch_results):
+                results[i] = result
+        return results
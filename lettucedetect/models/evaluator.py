@@ -1,13 +1,14 @@
 import json
 import logging
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, nullcontext
 
+import numpy as np
 import torch
 import torch.nn as nn
 from sklearn.metrics import (
-    accuracy_score,
     auc,
     classification_report,
-    precision_recall_fscore_support,
     roc_curve,
 )
 from torch.nn import Module
@@ -17,22 +18,164 @@ from tqdm.auto import tqdm
 from lettucedetect.datasets.hallucination_dataset import HallucinationSample
 from lettucedetect.models.inference import HallucinationDetector
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional, it only speeds up the character-level evaluator
+    njit = None
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
 
+def _to_device(batch: dict, device: torch.device) -> dict:
+    """Move every tensor in a batch to the device without blocking the host.
+
+    The copies are only asynchronous when the source tensors live in pinned memory, so
+    evaluation loaders should be built with ``pin_memory=True`` (and ideally ``num_workers > 0``).
+    Non-tensor entries (e.g. sentence boundaries) are passed through unchanged.
+
+    :param batch: A batch produced by the data loader.
+    :param device: The device to move the tensors to.
+    :return: The batch with all tensors on the device.
+    """
+    return {
+        key: value.to(device, non_blocking=True) if torch.is_tensor(value) else value
+        for key, value in batch.items()
+    }
+
+
+_AUTOCAST_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+
+
+def _autocast(device: torch.device | str, precision: str) -> AbstractContextManager:
+    """Return the autocast context for the evaluation forward pass.
+
+    Mixed precision is only used on CUDA; on other devices the forward runs in fp32.
+
+    :param device: The device the model runs on.
+    :param precision: One of "fp32", "bf16" or "fp16".
+    :return: An autocast context, or a no-op context for fp32.
+    :raises ValueError: If the precision is unknown.
+    """
+    if precision != "fp32" and precision not in _AUTOCAST_DTYPES:
+        raise ValueError(f"Unknown precision: {precision}. Use one of: fp32, bf16, fp16")
+    device = torch.device(device)
+    if precision == "fp32" or device.type != "cuda":
+        return nullcontext()
+    if precision == "bf16" and not torch.cuda.is_bf16_supported():
+        logger.warning("bf16 is not supported on this GPU, falling back to fp16 autocast")
+        precision = "fp16"
+    return torch.autocast(device_type=device.type, dtype=_AUTOCAST_DTYPES[precision])
+
+
+def binary_prf(
+    y_true: np.ndarray | list[int], y_pred: np.ndarray | list[int]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute per-class precision, recall and F1 for binary {0, 1} labels.
+
+    Equivalent to ``precision_recall_fscore_support(y_true, y_pred, labels=[0, 1],
+    average=None, zero_division=0)``, but the confusion matrix is a single ``np.bincount``.
+
+    :param y_true: Gold labels.
+    :param y_pred: Predicted labels.
+    :return: Precision, recall and F1 arrays, indexed by class.
+    """
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    return _prf_from_counts(np.bincount(2 * y_true + y_pred, minlength=4))
+
+
+def _prf_from_counts(counts: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute per-class precision, recall and F1 from binary confusion counts.
+
+    :param counts: The counts of (true, pred) pairs in the order [tn, fp, fn, tp].
+    :return: Precision, recall and F1 arrays, indexed by class.
+    """
+    tn, fp, fn, tp = counts
+
+    # Class 0 swaps the roles of positives and negatives.
+    true_pos = np.array([tn, tp], dtype=np.float64)
+    false_pos = np.array([fn, fp], dtype=np.float64)
+    false_neg = np.array([fp, fn], dtype=np.float64)
+
+    def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+        return np.divide(
+            numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0
+        )
+
+    precision = _safe_divide(true_pos, true_pos + false_pos)
+    recall = _safe_divide(true_pos, true_pos + false_neg)
+    f1 = _safe_divide(2 * true_pos, 2 * true_pos + false_pos + false_neg)
+    return precision, recall, f1
+
+
+class _CudaPrefetcher:
+    """Iterate over a data loader, copying the next batch to the GPU on a side stream.
+
+    While the model runs on the current stream, the host-to-device copy of the following
+    batch is issued on a dedicated stream so the transfer overlaps with compute. On
+    non-CUDA devices every batch is simply moved to the device.
+    """
+
+    def __init__(self, loader: DataLoader, device: torch.device | str):
+        """Initialize the prefetcher.
+
+        :param loader: The data loader to iterate over.
+        :param device: The device the batches are moved to.
+        """
+        self.loader = loader
+        self.device = torch.device(device)
+        self.stream = torch.cuda.Stream(self.device) if self.device.type == "cuda" else None
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+    def __iter__(self) -> Iterator[dict]:
+        if self.stream is None:
+            for batch in self.loader:
+                yield _to_device(batch, self.device)
+            return
+
+        batches = iter(self.loader)
+        next_batch = self._preload(batches)
+        while next_batch is not None:
+            current_stream = torch.cuda.current_stream(self.device)
+            current_stream.wait_stream(self.stream)
+            batch = next_batch
+            # The tensors were allocated on the side stream but are consumed on the current one.
+            for value in batch.values():
+                if torch.is_tensor(value):
+                    value.record_stream(current_stream)
+            next_batch = self._preload(batches)
+            yield batch
+
+    def _preload(self, batches: Iterator[dict]) -> dict | None:
+        try:
+            batch = next(batches)
+        except StopIteration:
+            return None
+        with torch.cuda.stream(self.stream):
+            return _to_device(batch, self.device)
+
+
 def evaluate_model(
     model: Module,
     dataloader: DataLoader,
     device: torch.device,
     verbose: bool = True,
+    precision: str = "bf16",
+    compile_model: bool = False,
 ) -> dict[str, dict[str, float]]:
     """Evaluate a model for hallucination detection.
 
     :param model: The model to evaluate.
-    :param dataloader: The data loader to use for evaluation.
+    :param dataloader: The data loader to use for evaluation. Build it with ``pin_memory=True``
+        so host-to-device copies can overlap with the forward pass.
     :param device: The device to use for evaluation.
     :param verbose: If True, print the evaluation metrics.
+    :param precision: Autocast precision of the forward pass on CUDA ("fp32", "bf16" or "fp16").
+    :param compile_model: If True, compile the model with ``torch.compile`` before evaluating.
+        The first batches of every new input shape pay the compilation cost.
     :return: A dictionary containing the evaluation metrics.
         {
             "supported": {"precision": float, "recall": float, "f1": float},
@@ -40,32 +183,41 @@ def evaluate_model(
         }
     """
     model.eval()
-    all_preds: list[int] = []
-    all_labels: list[int] = []
-
-    with torch.no_grad():
-        for batch in tqdm(dataloader, desc="Evaluating", leave=False):
-            outputs = model(
-                batch["input_ids"].to(device),
-                attention_mask=batch["attention_mask"].to(device),
-            )
-            logits: torch.Tensor = outputs.logits
-            predictions = torch.argmax(logits, dim=-1)
-
-            # Only evaluate on tokens that have labels (not -100)
+    if compile_model:
+        model = torch.compile(model, mode="reduce-overhead")
+    all_preds: list[torch.Tensor] = []
+    all_labels: list[torch.Tensor] = []
+    all_scores: list[torch.Tensor] = []
+
+    with torch.inference_mode():
+        for batch in tqdm(_CudaPrefetcher(dataloader, device), desc="Evaluating", leave=False):
+            with _autocast(device, precision):
+                outputs = model(batch["input_ids"], attention_mask=batch["attention_mask"])
+            logits: torch.Tensor = outputs.logits.float()
+            # The logit margin ranks tokens like the class-1 probability, which is all AUROC needs,
+            # and its sign gives the argmax of the binary head.
+            scores = logits[..., 1] - logits[..., 0]
+            predictions = scores > 0
+
+            # Only evaluate on tokens that have labels (not -100). The selected tokens stay on
+            # the device and are counted once after the loop.
             mask = batch["labels"] != -100
-            predictions = predictions[mask].cpu().numpy()
-            labels = batch["labels"][mask].cpu().numpy()
+            all_preds.append(predictions[mask].to(torch.uint8))
+            all_labels.append(batch["labels"][mask].to(torch.uint8))
+            all_scores.append(scores[mask])
 
-            all_preds.extend(predictions.tolist())
-            all_labels.extend(labels.tolist())
+        y_pred = torch.cat(all_preds) if all_preds else torch.empty(0, dtype=torch.uint8)
+        y_true = torch.cat(all_labels) if all_labels else torch.empty(0, dtype=torch.uint8)
+        # The confusion counts are taken on the device; the labels and scores are copied to the
+        # host once for AUROC (and the report).
+        counts = torch.bincount(2 * y_true.long() + y_pred.long(), minlength=4).cpu().numpy()
+        y_true = y_true.cpu().numpy()
+        y_score = torch.cat(all_scores).cpu().numpy() if all_scores else np.empty(0)
 
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        all_labels, all_preds, labels=[0, 1], average=None
-    )
+    precision, recall, f1 = _prf_from_counts(counts)
 
     # Calculating AUROC
-    fpr, tpr, _ = roc_curve(all_labels, all_preds)
+    fpr, tpr, _ = roc_curve(y_true, y_score)
     auroc = auc(fpr, tpr)
 
     results: dict[str, dict[str, float]] = {
@@ -84,7 +236,10 @@ def evaluate_model(
 
     if verbose:
         report = classification_report(
-            all_labels, all_preds, target_names=["Supported", "Hallucinated"], digits=4
+            y_true,
+            y_pred.cpu().numpy(),
+            target_names=["Supported", "Hallucinated"],
+            digits=4,
         )
         print("\nDetailed Classification Report:")
         print(report)
@@ -110,7 +265,9 @@ def print_metrics(metrics: dict[str, dict[str, float]]) -> None:
     print(f"  Recall: {metrics['supported']['recall']:.4f}")
     print(f"  F1: {metrics['supported']['f1']:.4f}")
 
-    print(f"\nAUROC: {metrics['auroc']:.4f}")
+    # Detectors that only output spans have no scores to rank, hence no AUROC.
+    if "auroc" in metrics:
+        print(f"\nAUROC: {metrics['auroc']:.4f}")
 
 
 def evaluate_model_example_level(
@@ -118,6 +275,8 @@ def evaluate_model_example_level(
     dataloader: DataLoader,
     device: torch.device,
     verbose: bool = True,
+    precision: str = "bf16",
+    compile_model: bool = False,
 ) -> dict[str, dict[str, float]]:
     """Evaluate a model for hallucination detection at the example level.
 
@@ -125,9 +284,13 @@ def evaluate_model_example_level(
     then the whole example is considered hallucinated. Otherwise, it is supported.
 
     :param model: The model to evaluate.
-    :param dataloader: DataLoader providing the evaluation batches.
+    :param dataloader: DataLoader providing the evaluation batches. Build it with
+        ``pin_memory=True`` so host-to-device copies can overlap with the forward pass.
     :param device: Device on which to perform evaluation.
     :param verbose: If True, prints a detailed classification report.
+    :param precision: Autocast precision of the forward pass on CUDA ("fp32", "bf16" or "fp16").
+    :param compile_model: If True, compile the model with ``torch.compile`` before evaluating.
+        The first batches of every new input shape pay the compilation cost.
 
     :return: A dict containing example-level metrics:
         {
@@ -136,52 +299,54 @@ def evaluate_model_example_level(
         }
     """
     model.eval()
+    if compile_model:
+        model = torch.compile(model, mode="reduce-overhead")
     example_preds: list[int] = []
     example_labels: list[int] = []
     example_probs: list[float] = []
 
-    with torch.no_grad():
-        for batch in tqdm(dataloader, desc="Evaluating (Example Level)", leave=False):
-            # Move inputs to device. Note that `batch["labels"]`
-            # can stay on CPU if you wish to avoid unnecessary transfers.
-            input_ids = batch["input_ids"].to(device)
-            attention_mask = batch["attention_mask"].to(device)
-
-            outputs = model(input_ids, attention_mask=attention_mask)
-            logits: torch.Tensor = outputs.logits  # Shape: [batch_size, seq_len, num_labels]
-            predictions: torch.Tensor = torch.argmax(logits, dim=-1)  # Shape: [batch_size, seq_len]
-            probs = torch.softmax(logits, dim=-1)
-
-            # Process each example in the batch separately.
-            for i in range(batch["labels"].size(0)):
-                sample_labels = batch["labels"][i]  # [seq_len]
-                sample_preds = predictions[i].cpu()  # [seq_len]
-                valid_mask = sample_labels != -100
-
-                if valid_mask.sum().item() == 0:
-                    true_example_label = 0
-                    pred_example_label = 0
-                    # Add a default probability score
-                    max_prob = 0.0
-                else:
-                    # Apply the valid mask and bring labels to CPU if needed.
-                    sample_labels = sample_labels[valid_mask].cpu()
-                    sample_preds = sample_preds[valid_mask]
-                    sample_probs = probs[i][valid_mask]
-
-                    # If any token in the sample is hallucinated (1), consider the whole sample hallucinated.
-                    true_example_label = 1 if (sample_labels == 1).any().item() else 0
-                    pred_example_label = 1 if (sample_preds == 1).any().item() else 0
-                    # Get the max probability for class 1 (hallucinated)
-                    max_prob = sample_probs[:, 1].max().item()
-
-                example_labels.append(true_example_label)
-                example_preds.append(pred_example_label)
-                example_probs.append(max_prob)
-
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        example_labels, example_preds, labels=[0, 1], average=None, zero_division=0
-    )
+    with torch.inference_mode():
+        for batch in tqdm(
+            _CudaPrefetcher(dataloader, device), desc="Evaluating (Example Level)", leave=False
+        ):
+            with _autocast(device, precision):
+                outputs = model(batch["input_ids"], attention_mask=batch["attention_mask"])
+            logits: torch.Tensor = (
+                outputs.logits.float()
+            )  # Shape: [batch_size, seq_len, num_labels]
+            # For the binary head, softmax(logits)[..., 1] == sigmoid(logits[..., 1] - logits[..., 0]).
+            # Sigmoid is monotonic, so it is applied to the per-example maximum only.
+            scores = logits[..., 1] - logits[..., 0]  # Shape: [batch_size, seq_len]
+            # A positive margin is the argmax of the binary head.
+            predictions = scores > 0  # Shape: [batch_size, seq_len]
+
+            # Reduce every example of the batch at once: [batch_size, seq_len] -> [batch_size].
+            labels = batch["labels"]
+            valid_mask = labels != -100
+            # If any token in the sample is hallucinated (1), consider the whole sample hallucinated.
+            true_example_labels = ((labels == 1) & valid_mask).any(dim=1)
+            pred_example_labels = (predictions & valid_mask).any(dim=1)
+            # Max probability for class 1 (hallucinated), 0.0 for examples without valid tokens.
+            max_scores = scores.masked_fill(~valid_mask, float("-inf")).amax(dim=1)
+            max_probs = torch.where(valid_mask.any(dim=1), torch.sigmoid(max_scores), 0.0)
+
+            # The three per-example results come back to the host in one copy.
+            reduced = (
+                torch.stack(
+                    [
+                        true_example_labels.to(max_probs.dtype),
+                        pred_example_labels.to(max_probs.dtype),
+                        max_probs,
+                    ]
+                )
+                .cpu()
+                .numpy()
+            )
+            example_labels.extend(reduced[0].astype(np.int64).tolist())
+            example_preds.extend(reduced[1].astype(np.int64).tolist())
+            example_probs.extend(reduced[2].tolist())
+
+    precision, recall, f1 = binary_prf(example_labels, example_preds)
 
     results: dict[str, dict[str, float]] = {
         "supported": {  # Class 0
@@ -229,9 +394,92 @@ def create_sample_llm(sample, labels):
     )
 
 
+def _sweep_overlap(pred_bounds: np.ndarray, gold_bounds: np.ndarray) -> int:
+    """Sum the pairwise overlap of two sets of non-empty [start, end) spans.
+
+    Instead of intersecting every pair, the span endpoints are sorted and swept once: between
+    two consecutive endpoints, each covered character contributes (#predicted spans covering it)
+    * (#gold spans covering it). This runs in O((P + G) log(P + G)) rather than O(P * G), but
+    only beats the pairwise loop once it is compiled, so it is only used with numba.
+
+    :param pred_bounds: int64 array of shape [P, 2] with predicted (start, end) offsets.
+    :param gold_bounds: int64 array of shape [G, 2] with gold (start, end) offsets.
+    :return: The total pairwise overlap in characters.
+    """
+    num_pred = pred_bounds.shape[0]
+    num_events = 2 * (num_pred + gold_bounds.shape[0])
+    positions = np.empty(num_events, dtype=np.int64)
+    deltas = np.empty(num_events, dtype=np.int64)
+    is_gold = np.empty(num_events, dtype=np.bool_)
+    for k in range(num_events // 2):
+        bounds = pred_bounds[k] if k < num_pred else gold_bounds[k - num_pred]
+        positions[2 * k], positions[2 * k + 1] = bounds[0], bounds[1]
+        deltas[2 * k], deltas[2 * k + 1] = 1, -1
+        is_gold[2 * k] = is_gold[2 * k + 1] = k >= num_pred
+
+    overlap = 0
+    open_pred = 0
+    open_gold = 0
+    order = np.argsort(positions, kind="mergesort")
+    position = positions[order[0]]
+    for k in order:
+        overlap += (positions[k] - position) * open_pred * open_gold
+        if is_gold[k]:
+            open_gold += deltas[k]
+        else:
+            open_pred += deltas[k]
+        position = positions[k]
+    return overlap
+
+
+if njit is not None:
+    _sweep_overlap = njit(cache=True)(_sweep_overlap)
+
+
+def _pairwise_overlap(predicted_spans: list[dict], gold_spans: list[dict]) -> int:
+    """Sum the character overlap of every (predicted, gold) span pair, one pair at a time.
+
+    :param predicted_spans: Spans with "start" and "end" character offsets.
+    :param gold_spans: Spans with "start" and "end" character offsets.
+    :return: The total pairwise overlap in characters.
+    """
+    overlap = 0
+    for pred in predicted_spans:
+        for gold in gold_spans:
+            overlap_start = max(pred["start"], gold["start"])
+            overlap_end = min(pred["end"], gold["end"])
+            if overlap_end > overlap_start:
+                overlap += overlap_end - overlap_start
+    return overlap
+
+
+def _span_bounds(spans: list[dict]) -> np.ndarray:
+    # Empty or inverted spans can not overlap anything.
+    bounds = [(span["start"], span["end"]) for span in spans if span["end"] > span["start"]]
+    return np.array(bounds, dtype=np.int64).reshape(-1, 2)
+
+
+def _span_overlap_length(predicted_spans: list[dict], gold_spans: list[dict]) -> int:
+    """Sum the character overlap of every (predicted, gold) span pair.
+
+    :param predicted_spans: Spans with "start" and "end" character offsets.
+    :param gold_spans: Spans with "start" and "end" character offsets.
+    :return: The total pairwise overlap in characters.
+    """
+    if njit is None:
+        # Interpreted, the sweep is slower than the plain loop for the few spans per sample.
+        return _pairwise_overlap(predicted_spans, gold_spans)
+    pred_bounds = _span_bounds(predicted_spans)
+    gold_bounds = _span_bounds(gold_spans)
+    if len(pred_bounds) == 0 or len(gold_bounds) == 0:
+        return 0
+    return int(_sweep_overlap(pred_bounds, gold_bounds))
+
+
 def evaluate_detector_char_level(
     detector: HallucinationDetector,
     samples: list[HallucinationSample],
+    batch_size: int = 16,
 ) -> dict[str, float]:
     """Evaluate the HallucinationDetector at the character level.
 
@@ -247,35 +495,34 @@ def evaluate_detector_char_level(
 
     :param detector: The detector to evaluate.
     :param samples: A list of samples to evaluate.
+    :param batch_size: Number of samples passed to the detector per call.
     :return: A dictionary with global metrics: {"char_precision": ..., "char_recall": ..., "char_f1": ...}
     """
     total_overlap = 0
     total_predicted = 0
     total_gold = 0
 
-    for sample in tqdm(samples, desc="Evaluating", leave=False):
-        prompt = sample.prompt
-        answer = sample.answer
-        gold_spans = sample.labels
-        predicted_spans = detector.predict_prompt(prompt, answer, output_format="spans")
+    for i in tqdm(range(0, len(samples), batch_size), desc="Evaluating", leave=False):
+        batch = samples[i : i + batch_size]
+        prompts = [sample.prompt for sample in batch]
+        answers = [sample.answer for sample in batch]
+        batch_predicted_spans = detector.predict_prompt_batch(
+            prompts, answers, output_format="spans"
+        )
 
-        # Compute total predicted span length for this sample.
-        sample_predicted_length = sum(pred["end"] - pred["start"] for pred in predicted_spans)
-        total_predicted += sample_predicted_length
+        for sample, predicted_spans in zip(batch, batch_predicted_spans):
+            gold_spans = sample.labels
 
-        # Compute total gold span length once for this sample.
-        sample_gold_length = sum(gold["end"] - gold["start"] for gold in gold_spans)
-        total_gold += sample_gold_length
+            # Compute total predicted span length for this sample.
+            sample_predicted_length = sum(pred["end"] - pred["start"] for pred in predicted_spans)
+            total_predicted += sample_predicted_length
 
-        # Now, compute the overlap between each predicted span and each gold span.
-        sample_overlap = 0
-        for pred in predicted_spans:
-            for gold in gold_spans:
-                overlap_start = max(pred["start"], gold["start"])
-                overlap_end = min(pred["end"], gold["end"])
-                if overlap_end > overlap_start:
-                    sample_overlap += overlap_end - overlap_start
-        total_overlap += sample_overlap
+            # Compute total gold span length once for this sample.
+            sample_gold_length = sum(gold["end"] - gold["start"] for gold in gold_spans)
+            total_gold += sample_gold_length
+
+            # Now, compute the overlap between each predicted span and each gold span.
+            total_overlap += _span_overlap_length(predicted_spans, gold_spans)
 
     precision = total_overlap / total_predicted if total_predicted > 0 else 0
     recall = total_overlap / total_gold if total_gold > 0 else 0
@@ -284,6 +531,27 @@ def evaluate_detector_char_level(
     return {"precision": precision, "recall": recall, "f1": f1}
 
 
+def _split_samples(
+    samples: list[HallucinationSample],
+) -> tuple[list[str], list[str | list[str]], np.ndarray]:
+    """Split samples into parallel prompt, answer and example-label sequences.
+
+    Answers are the pre-split answer sentences when the sample has them. An example is
+    labelled hallucinated (1) if it has any gold span.
+
+    :param samples: The samples to split.
+    :return: The prompts, the answers and an int8 array of example labels.
+    """
+    prompts = [sample.prompt for sample in samples]
+    answers = [
+        sample.answer_sentences if sample.answer_sentences else sample.answer for sample in samples
+    ]
+    example_labels = np.fromiter(
+        (1 if sample.labels else 0 for sample in samples), dtype=np.int8, count=len(samples)
+    )
+    return prompts, answers, example_labels
+
+
 def evaluate_detector_example_level_batch(
     detector: HallucinationDetector,
     samples: list[HallucinationSample],
@@ -299,28 +567,28 @@ def evaluate_detector_example_level_batch(
                       indicating the character indices of the gold (human-labeled) span.
 
     """
-    example_preds: list[int] = []
-    example_labels: list[int] = []
-
-    for i in tqdm(range(0, len(samples), batch_size), desc="Evaluating", leave=False):
-        batch = samples[i : i + batch_size]
-        prompts = [sample.prompt for sample in batch]
-        answers = [
-            sample.answer_sentences if sample.answer_sentences else sample.answer
-            for sample in batch
-        ]
-        predicted_spans = detector.predict_prompt_batch(prompts, answers, output_format="spans")
+    prompts, answers, example_labels = _split_samples(samples)
+    example_preds = np.zeros(len(samples), dtype=np.int8)
 
-        for sample, pred_spans in zip(batch, predicted_spans):
-            true_example_label = 1 if sample.labels else 0
-            pred_example_label = 1 if pred_spans else 0
+    # Batch samples of similar length together, so little compute is spent on padding. The
+    # predictions are written back through the permutation, which restores the input order.
+    lengths = [
+        len(prompt) + (len(answer) if isinstance(answer, str) else sum(map(len, answer)))
+        for prompt, answer in zip(prompts, answers)
+    ]
+    order = np.argsort(lengths, kind="stable")
 
-            example_labels.append(true_example_label)
-            example_preds.append(pred_example_label)
+    for i in tqdm(range(0, len(samples), batch_size), desc="Evaluating", leave=False):
+        batch_order = order[i : i + batch_size]
+        predicted_spans = detector.predict_prompt_batch(
+            [prompts[j] for j in batch_order],
+            [answers[j] for j in batch_order],
+            output_format="spans",
+        )
+        # Raises if the detector returned a different number of results than it got inputs.
+        example_preds[batch_order] = [1 if spans else 0 for spans in predicted_spans]
 
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        example_labels, example_preds, labels=[0, 1], average=None, zero_division=0
-    )
+    precision, recall, f1 = binary_prf(example_labels, example_preds)
 
     results: dict[str, dict[str, float]] = {
         "supported": {  # Class 0
@@ -335,11 +603,6 @@ def evaluate_detector_example_level_batch(
         },
     }
 
-    # Calculating AUROC
-    fpr, tpr, _ = roc_curve(example_labels, example_preds)
-    auroc = auc(fpr, tpr)
-    results["auroc"] = auroc
-
     if verbose:
         report = classification_report(
             example_labels,
@@ -381,23 +644,16 @@ def evaluate_detector_example_level(
             "hallucinated": {"precision": float, "recall": float, "f1": float}
         }
     """
-    example_preds: list[int] = []
-    example_labels: list[int] = []
+    prompts, answers, example_labels = _split_samples(samples)
+    example_preds = np.zeros(len(samples), dtype=np.int8)
 
-    for sample in tqdm(samples, desc="Evaluating", leave=False):
-        prompt = sample.prompt
-        answer = sample.answer_sentences if sample.answer_sentences else sample.answer
-        gold_spans = sample.labels
+    for i, (prompt, answer) in enumerate(
+        tqdm(zip(prompts, answers), total=len(samples), desc="Evaluating", leave=False)
+    ):
         predicted_spans = detector.predict_prompt(prompt, answer, output_format="spans")
-        true_example_label = 1 if gold_spans else 0
-        pred_example_label = 1 if predicted_spans else 0
-
-        example_labels.append(true_example_label)
-        example_preds.append(pred_example_label)
+        example_preds[i] = 1 if predicted_spans else 0
 
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        example_labels, example_preds, labels=[0, 1], average=None, zero_division=0
-    )
+    precision, recall, f1 = binary_prf(example_labels, example_preds)
 
     results: dict[str, dict[str, float]] = {
         "supported": {  # Class 0
@@ -412,12 +668,6 @@ def evaluate_detector_example_level(
         },
     }
 
-    # Calculating AUROC
-    fpr, tpr, _ = roc_curve(example_labels, example_preds)
-    auroc = auc(fpr, tpr)
-
-    results["auroc"] = auroc
-
     if verbose:
         report = classification_report(
             example_labels,
@@ -434,29 +684,55 @@ def evaluate_detector_example_level(
 
 
 def evaluate_sentence_model(
-    model: nn.Module, test_loader: DataLoader, device: torch.device, criterion, verbose: bool = True
+    model: nn.Module,
+    test_loader: DataLoader,
+    device: torch.device,
+    criterion,
+    verbose: bool = True,
+    precision: str = "bf16",
+    compile_model: bool = False,
 ) -> dict[str, dict[str, float]]:
-    """Evaluate the model on the test dataset"""
+    """Evaluate the model on the test dataset.
+
+    The loader should be built with ``pin_memory=True`` so host-to-device copies of the
+    inputs and per-document labels can overlap with the forward pass.
+
+    :param precision: Autocast precision of the forward pass on CUDA ("fp32", "bf16" or "fp16").
+    :param compile_model: If True, compile the model with ``torch.compile`` before evaluating.
+    """
     model.eval()
+    if compile_model:
+        model = torch.compile(model, mode="reduce-overhead")
     total_loss = 0.0
     step_count = 0
 
-    all_preds = []
-    all_labels = []
+    all_preds: list[np.ndarray] = []
+    all_labels: list[np.ndarray] = []
+    all_scores: list[np.ndarray] = []
     try:
-        with torch.no_grad():
-            progress_bar = tqdm(test_loader, desc="Evaluating", leave=False)
+        with torch.inference_mode():
+            progress_bar = tqdm(
+                _CudaPrefetcher(test_loader, device), desc="Evaluating", leave=False
+            )
             for batch in progress_bar:
                 try:
-                    input_ids = batch["input_ids"].to(device)
-                    attention_mask = batch["attention_mask"].to(device)
+                    input_ids = batch["input_ids"]
+                    attention_mask = batch["attention_mask"]
                     sentence_boundaries = batch["sentence_boundaries"]
                     labels_list = batch["labels"]
 
-                    logits_list = model(input_ids, attention_mask, sentence_boundaries)
+                    with _autocast(device, precision):
+                        logits_list = model(input_ids, attention_mask, sentence_boundaries)
+
+                    # Copy the labels of all documents to the device at once and slice per document.
+                    label_offsets = np.cumsum([0] + [labels.size(0) for labels in labels_list])
+                    labels_cat = torch.cat(labels_list).to(device, non_blocking=True)
 
                     batch_loss = 0.0
                     doc_count = 0
+                    batch_preds: list[torch.Tensor] = []
+                    batch_scores: list[torch.Tensor] = []
+                    batch_labels: list[np.ndarray] = []
 
                     for i, logits in enumerate(logits_list):
                         # skip if we have a mismatch in lists
@@ -466,9 +742,10 @@ def evaluate_sentence_model(
                             )
                             continue
 
-                        labels_i = labels_list[i].to(device)
+                        labels_i = labels_cat[label_offsets[i] : label_offsets[i + 1]]
                         if logits.size(0) == 0:
                             continue
+                        logits = logits.float()
 
                         # Make sure sizes match
                         effective_size = min(logits.size(0), labels_i.size(0))
@@ -484,21 +761,29 @@ def evaluate_sentence_model(
                         batch_loss += loss_i
                         doc_count += 1
 
-                        # Get predictions for metrics
-                        preds_i = torch.argmax(logits, dim=1).cpu().numpy()
-                        labels_i_np = labels_i.cpu().numpy()
-
-                        # Extend lists with batch predictions and labels
-                        all_preds.extend(preds_i)
-                        all_labels.extend(labels_i_np)
+                        # Get predictions for metrics, fetched for the whole batch below.
+                        batch_preds.append(torch.argmax(logits, dim=1))
+                        batch_scores.append(logits[:, 1] - logits[:, 0])
+                        # The host copy of the labels is still around, no need to fetch it back.
+                        batch_labels.append(labels_list[i][: labels_i.size(0)].numpy())
 
                     if doc_count > 0:
-                        batch_loss = batch_loss / doc_count
-                        total_loss += batch_loss.item()
+                        # Predictions and scores of the batch come back in one copy.
+                        fetched = (
+                            torch.stack([torch.cat(batch_preds).float(), torch.cat(batch_scores)])
+                            .cpu()
+                            .numpy()
+                        )
+                        all_preds.append(fetched[0].astype(np.int64))
+                        all_scores.append(fetched[1])
+                        all_labels.extend(batch_labels)
+
+                        batch_loss = (batch_loss / doc_count).item()
+                        total_loss += batch_loss
                         step_count += 1
 
                         # Update progress bar with loss
-                        progress_bar.set_postfix({"loss": f"{batch_loss.item():.4f}"})
+                        progress_bar.set_postfix({"loss": f"{batch_loss:.4f}"})
                 except Exception as e:
                     logger.error(f"Error evaluating batch: {e}")
                     continue
@@ -506,6 +791,10 @@ def evaluate_sentence_model(
         logger.error(f"Error during evaluation: {e}")
         # if we have no results still try to return partial metrics
 
+    all_preds = np.concatenate(all_preds) if all_preds else np.empty(0, dtype=np.int64)
+    all_labels = np.concatenate(all_labels) if all_labels else np.empty(0, dtype=np.int64)
+    all_scores = np.concatenate(all_scores) if all_scores else np.empty(0, dtype=np.float32)
+
     # Calculate metrics
     results = {}
 
@@ -530,13 +819,11 @@ def evaluate_sentence_model(
 
     try:
         if len(all_preds) > 0:
-            precision, recall, f1, _ = precision_recall_fscore_support(
-                all_labels, all_preds, average=None, labels=[0, 1], zero_division=0
-            )
-            accuracy = accuracy_score(all_labels, all_preds)
+            precision, recall, f1 = binary_prf(all_labels, all_preds)
+            accuracy = float(np.mean(all_labels == all_preds))
 
             # Calculating AUROC
-            fpr, tpr, _ = roc_curve(all_labels, all_preds)
+            fpr, tpr, _ = roc_curve(all_labels, all_scores)
             auroc = auc(fpr, tpr)
 
             results["supported"] = {  # Class 0
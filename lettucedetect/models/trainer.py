@@ -114,7 +114,8 @@ class Trainer:
             )
 
             print("\nEvaluating...")
-            metrics = evaluate_model(self.model, self.test_loader, self.device)
+            # Checkpoints are selected on fp32 metrics, like the model is trained.
+            metrics = evaluate_model(self.model, self.test_loader, self.device, precision="fp32")
             print_metrics(metrics)
 
             if metrics["hallucinated"]["f1"] > best_f1:
@@ -390,7 +391,12 @@ class SentenceTrainer:
             if self.test_loader is not None:
                 print("\nEvaluating...")
                 metrics = evaluate_sentence_model(
-                    self.model, self.test_loader, self.device, self.criterion, verbose=True
+                    self.model,
+                    self.test_loader,
+                    self.device,
+                    self.criterion,
+                    verbose=True,
+                    precision="fp32",
                 )
                 print("Validation metrics:")
                 print_metrics(metrics)
@@ -1,6 +1,5 @@
 import argparse
 import json
-import re
 from pathlib import Path
 
 from datasets import load_dataset
@@ -54,8 +53,8 @@ def create_labels(response, hallucinations):
     labels = []
     resp = " ".join([sentence for _, sentence in response["response_sentences"]])
     for hal in hallucinations:
-        match = re.search(re.escape(hal), resp)
-        labels.append({"start": match.start(), "end": match.end(), "label": "Not supported"})
+        start = resp.index(hal)
+        labels.append({"start": start, "end": start + len(hal), "label": "Not supported"})
     return labels
 
 
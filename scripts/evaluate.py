@@ -45,6 +45,7 @@ def evaluate_task_samples(
             batch_size=batch_size,
             shuffle=False,
             collate_fn=data_collator,
+            pin_memory=torch.cuda.is_available(),
         )
 
         eval_map = {
@@ -59,7 +60,7 @@ def evaluate_task_samples(
 
     else:  # char_level
         print("\n---- Character-Level Span Evaluation ----")
-        metrics = evaluate_detector_char_level(detector, samples)
+        metrics = evaluate_detector_char_level(detector, samples, batch_size=batch_size)
         print(f"  Precision: {metrics['precision']:.4f}")
         print(f"  Recall: {metrics['recall']:.4f}")
         print(f"  F1: {metrics['f1']:.4f}")
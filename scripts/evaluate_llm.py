@@ -15,25 +15,29 @@ from lettucedetect.models.inference import HallucinationDetector
 
 
 def evaluate_task_samples_llm(
-    samples: list[HallucinationSample], evaluation_type: str, detector: HallucinationDetector
+    samples: list[HallucinationSample],
+    evaluation_type: str,
+    detector: HallucinationDetector,
+    batch_size: int = 100,
 ):
     """Evaluate the model on the samples.
 
     :param samples: list of samples to evaluate
     :param evaluation_type: evaluation type (example_level or char_level)
     :param detector: detector to use
+    :param batch_size: number of samples sent to the detector at once, requested concurrently
     :return: metrics and hallucination data
     """
     print(f"\nEvaluating model on {len(samples)} samples")
 
     if evaluation_type == "example_level":
         print("\n---- Example-Level Span Evaluation ----")
-        metrics = evaluate_detector_example_level_batch(detector, samples)
+        metrics = evaluate_detector_example_level_batch(detector, samples, batch_size=batch_size)
         print_metrics(metrics)
         return metrics
     elif evaluation_type == "char_level":
         print("\n---- Character-Level Span Evaluation ----")
-        metrics = evaluate_detector_char_level(detector, samples)
+        metrics = evaluate_detector_char_level(detector, samples, batch_size=batch_size)
         print(f"  Precision: {metrics['precision']:.4f}")
         print(f"  Recall: {metrics['recall']:.4f}")
         print(f"  F1: {metrics['f1']:.4f}")
@@ -96,6 +100,18 @@ def main():
         default=None,
         help="Path to the cache file",
     )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=100,
+        help="Number of samples handed to the detector at once",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=30,
+        help="Maximum number of concurrent LLM requests",
+    )
 
     args = parser.parse_args()
 
@@ -109,6 +125,7 @@ def main():
         cache_file=args.cache_path,
         model=args.model,
         zero_shot=args.zero_shot,
+        max_workers=args.max_workers,
     )
 
     # Evaluate the whole dataset
@@ -117,6 +134,7 @@ def main():
         test_samples,
         args.evaluation_type,
         detector=detector,
+        batch_size=args.batch_size,
     )
 
     for task_type, samples in task_type_map.items():
@@ -125,6 +143,7 @@ def main():
             samples,
             args.evaluation_type,
             detector=detector,
+            batch_size=args.batch_size,
         )
 
 
@@ -5,7 +5,6 @@ from pathlib import Path
 from sklearn.metrics import (
     auc,
     classification_report,
-    precision_recall_fscore_support,
     roc_curve,
 )
 from tqdm.auto import tqdm
@@ -14,7 +13,7 @@ from lettucedetect.datasets.hallucination_dataset import (
     HallucinationData,
     HallucinationSample,
 )
-from lettucedetect.models.evaluator import print_metrics
+from lettucedetect.models.evaluator import binary_prf, print_metrics
 
 
 def evaluate_ragas(
@@ -63,9 +62,7 @@ def evaluate_ragas(
         example_labels.append(true_example_label)
         example_preds.append(pred_example_label)
 
-    precision, recall, f1, _ = precision_recall_fscore_support(
-        example_labels, example_preds, labels=[0, 1], average=None, zero_division=0
-    )
+    precision, recall, f1 = binary_prf(example_labels, example_preds)
 
     results: dict[str, dict[str, float]] = {
         "supported": {  # Class 0
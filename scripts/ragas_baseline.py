@@ -1,15 +1,37 @@
 import argparse
+import asyncio
+import hashlib
 import json
+import logging
 import os
+from dataclasses import replace
 from pathlib import Path
 
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
 from langchain_community.chat_models import ChatOpenAI
+from openai import APIConnectionError, AsyncOpenAI, RateLimitError
+from ragas.cache import DiskCacheBackend
 from ragas.dataset_schema import SingleTurnSample
 from ragas.llms import LangchainLLMWrapper
 from ragas.metrics import Faithfulness
+from ragas.run_config import RunConfig
+from tqdm.asyncio import tqdm_asyncio
 
 from lettucedetect.datasets.hallucination_dataset import HallucinationData, HallucinationSample
 
+try:
+    import uvloop
+except ImportError:  # uvloop is optional and not available on Windows, it only speeds up the loop
+    uvloop = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger("ragas_baseline")
+
 
 def get_api_key() -> str:
     """Get OpenAI client configured from environment variables.
@@ -24,39 +46,32 @@ def get_api_key() -> str:
 
 
 def split_prompt(sample):
-    if sample.task_type == "Summary":
-        user_input = sample.prompt.split(":")[0] if ":" in sample.prompt else sample.task_type
-        retrieved_contexts = sample.prompt.split(":")[1:] if ":" in sample.prompt else sample.prompt
-    else:
-        user_input = sample.prompt.split(":")[:2] if ":" in sample.prompt else sample.task_type
-        retrieved_contexts = sample.prompt.split(":")[2:] if ":" in sample.prompt else sample.prompt
-    user_input = " ".join(user_input)
-    return user_input, retrieved_contexts
+    parts = sample.prompt.split(":")
+    if len(parts) == 1:
+        return sample.task_type, [sample.prompt]
+    n = 1 if sample.task_type == "Summary" else 2
+    return " ".join(parts[:n]), parts[n:]
 
 
-def evaluate_metrics(sample, llm):
+async def evaluate_metrics(sample, metric):
     user_input, retrieved_contexts = split_prompt(sample)
     sample = SingleTurnSample(
         user_input=user_input,
         response=sample.answer,
         retrieved_contexts=retrieved_contexts,
     )
-    metric = Faithfulness(llm=llm)
     results = {}
-    try:
-        results["faithfulness"] = metric.single_turn_score(sample)
-    except Exception as e:
-        results["faithfulness"] = f"Error: {e}"
-    print(results)
+    results["faithfulness"] = await metric.single_turn_ascore(sample)
+    logger.debug(f"Faithfulness {results['faithfulness']}")
     return results
 
 
-def create_sample_baseline(sample, llm):
+async def create_sample_baseline(sample, metric):
     """Creates a sample of data where the RAGAS faithfullness is stored in the labels list."""
     prompt = sample.prompt
     answer = sample.answer
 
-    ragas_metrics = evaluate_metrics(sample, llm)
+    ragas_metrics = await evaluate_metrics(sample, metric)
     for threshold in [0.4, 0.5, 0.6, 0.7]:
         ragas_metrics[f"threshold_{threshold}"] = (
             1 if ragas_metrics["faithfulness"] < threshold else 0
@@ -68,58 +83,158 @@ def create_sample_baseline(sample, llm):
     return HallucinationSample(prompt, answer, [ragas_metrics], split, task_type, dataset, language)
 
 
+def sample_key(sample: HallucinationSample) -> str:
+    """Hash a sample by its prompt and answer, so scored samples are found again on resume.
+
+    :param sample: The sample to hash.
+    :return: The hex digest of the prompt and answer.
+    """
+    return hashlib.sha256(sample.prompt.encode() + b"\0" + sample.answer.encode()).hexdigest()
+
+
 def load_check_existing_data(output_file: Path) -> HallucinationData:
-    """Load existing data or create new data.
+    """Load the samples scored by earlier runs, from the output file and its checkpoint.
+
     :param output_file: Path to the output file
-    :return: Existing HallucinationData or new empty HallucinationData
+    :return: HallucinationData with the scored samples, empty if there are none
     """
+    # Unlike orjson, json reads the NaN faithfulness that RAGAS gives answers without statements.
+    samples = []
     if output_file.exists():
         try:
-            return HallucinationData.from_json(json.loads(output_file.read_text()))
-        except (json.JSONDecodeError, KeyError):
-            return HallucinationData(samples=[])
-    else:
-        return HallucinationData(samples=[])
-
-
-def main(
+            samples += HallucinationData.from_json(json.loads(output_file.read_bytes())).samples
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+            pass
+
+    checkpoint = output_file.with_suffix(".jsonl")
+    if checkpoint.exists():
+        data = checkpoint.read_bytes()
+        if data and not data.endswith(b"\n"):
+            # Terminate a partially written last line so new samples start on their own line.
+            with checkpoint.open("ab") as f:
+                f.write(b"\n")
+        for line in data.splitlines():
+            try:
+                samples.append(HallucinationSample.from_json(json.loads(line)))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                # Blank, partially written or malformed line, e.g. from an interrupted run.
+                continue
+    return HallucinationData(samples=samples)
+
+
+async def main(
     input_file: Path,
     output_file: Path,
+    max_concurrency: int = 32,
+    qpm: int = 500,
+    cache_dir: str = ".ragas_cache",
 ):
     """Creates RAGAS baseline for each sample.
 
     :param input_dir: Path to the input file.
     :param output_dir: Path to the output file.
+    :param max_concurrency: Maximum number of samples scored at the same time.
+    :param qpm: Maximum number of requests sent to the LLM API per minute.
+    :param cache_dir: Directory of the RAGAS cache for the LLM calls of the metric.
 
     """
     input_file = Path(input_file)
     output_file = Path(output_file)
 
-    hallucination_data = HallucinationData.from_json(json.loads(input_file.read_text()))
+    hallucination_data = HallucinationData.from_json(orjson.loads(input_file.read_bytes()))
     samples = [sample for sample in hallucination_data.samples if sample.split == "test"]
-    print(len(samples))
-    hallucination_data_ragas = load_check_existing_data(output_file=output_file)
-    num_processed = len(hallucination_data_ragas.samples)
-    total_samples = len(hallucination_data_ragas.samples)
-    print(num_processed)
-    llm = LangchainLLMWrapper(
-        ChatOpenAI(model="gpt-4o-mini", openai_api_key=get_api_key(), temperature=0)
-    )
-
-    samples_to_process = samples[num_processed:]
-    for i, sample in enumerate(samples_to_process, start=num_processed):
-        print("--------", i, "--------")
-        sample_ragas = create_sample_baseline(sample, llm)
-        hallucination_data_ragas.samples.append(sample_ragas)
-        if (i + 1) % 50 == 0 or (i + 1) == total_samples:
-            (output_file).write_text(json.dumps(hallucination_data_ragas.to_json(), indent=4))
+    logger.info(f"Loaded {len(samples)} test samples")
+    scored = {
+        sample_key(sample): sample
+        for sample in load_check_existing_data(output_file=output_file).samples
+    }
+    logger.info(f"Found {len(scored)} samples scored by earlier runs")
+    api_key = get_api_key()
+    # One score makes several chat calls, so the limit is applied to every request the client
+    # sends, retries included. Calls answered from the cache never reach the client.
+    limiter = AsyncLimiter(max_rate=qpm, time_period=60)
+
+    async def wait_for_rate_limit(request: httpx.Request) -> None:
+        await limiter.acquire()
+
+    # One connection pool for all samples, so concurrent requests reuse open connections instead
+    # of paying a new TLS handshake.
+    async with httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+        ),
+        timeout=60,
+        event_hooks={"request": [wait_for_rate_limit]},
+    ) as http_client:
+        llm = LangchainLLMWrapper(
+            ChatOpenAI(
+                model="gpt-4o-mini",
+                openai_api_key=api_key,
+                temperature=0,
+                async_client=AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=os.getenv("OPENAI_API_BASE") or None,
+                    http_client=http_client,
+                    # RAGAS retries the calls itself, see the run config below.
+                    max_retries=0,
+                ).chat.completions,
+            ),
+            # Back off and retry on rate limits and dropped connections.
+            run_config=RunConfig(
+                max_retries=6,
+                max_wait=30,
+                exception_types=(RateLimitError, APIConnectionError),
+            ),
+            cache=DiskCacheBackend(cache_dir),
+        )
+        # The metric only holds the LLM and its prompts, so all samples share one instance.
+        metric = Faithfulness(llm=llm)
+
+        # Samples scored by an earlier run are reused wherever they are in the input, and samples
+        # with the same prompt and answer are scored once. Each copy keeps its own metadata.
+        finished = {}
+        groups = {}
+        for i, sample in enumerate(samples):
+            key = sample_key(sample)
+            if key in scored:
+                finished[i] = replace(sample, labels=scored[key].labels)
+            else:
+                groups.setdefault(key, []).append(i)
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(key: str, sample: HallucinationSample) -> tuple[str, HallucinationSample]:
+            async with semaphore:
+                return key, await create_sample_baseline(sample, metric)
+
+        # The scoring is bound by LLM latency, so keep several requests in flight. Each sample is
+        # appended to the checkpoint as it comes back, so an interrupted run keeps its progress.
+        tasks = [bounded(key, samples[group[0]]) for key, group in groups.items()]
+        checkpoint = output_file.with_suffix(".jsonl")
+        with checkpoint.open("ab") as f:
+            for task in tqdm_asyncio.as_completed(tasks, total=len(tasks), desc="Scoring"):
+                key, sample_ragas = await task
+                for i in groups[key]:
+                    finished[i] = replace(samples[i], labels=sample_ragas.labels)
+                f.write(json.dumps(sample_ragas.to_json()).encode() + b"\n")
+                f.flush()
+
+    # Written with json rather than orjson, which would turn a NaN faithfulness into null.
+    hallucination_data_ragas = HallucinationData(samples=[finished[i] for i in range(len(samples))])
+    output_file.write_text(json.dumps(hallucination_data_ragas.to_json(), indent=4))
+    # The output now holds every sample of the checkpoint.
+    checkpoint.unlink()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input_file", type=str, required=True)
     parser.add_argument("--output_file", type=str, required=True)
+    parser.add_argument("--max_concurrency", type=int, default=32)
+    parser.add_argument("--qpm", type=int, default=500)
+    parser.add_argument("--cache_dir", type=str, default=".ragas_cache")
 
     args = parser.parse_args()
 
-    main(args.input_file, args.output_file)
+    run = uvloop.run if uvloop is not None else asyncio.run
+    run(main(args.input_file, args.output_file, args.max_concurrency, args.qpm, args.cache_dir))
@@ -143,6 +143,7 @@ def main():
         batch_size=args.batch_size,
         shuffle=False,
         collate_fn=data_collator,
+        pin_memory=torch.cuda.is_available(),
     )
 
     if args.method == "transformer":
@@ -0,0 +1,56 @@
+"""Pytest tests for the detector cache."""
+
+import json
+
+from lettucedetect.detectors.cache import CacheManager
+
+
+class TestCacheManager:
+    """Tests for the CacheManager class."""
+
+    def test_set_and_reopen(self, tmp_path):
+        """Entries are appended as lines and found again after re-opening the file."""
+        path = tmp_path / "cache.json"
+        cache = CacheManager(path)
+        cache.set("a", [{"start": 0, "end": 3}])
+        cache.set("b", [])
+
+        assert len(path.read_text().splitlines()) == 2
+        reopened = CacheManager(path)
+        assert reopened.get("a") == [{"start": 0, "end": 3}]
+        assert reopened.get("b") == []
+        assert reopened.get("c") is None
+
+    def test_migrates_legacy_json_object(self, tmp_path):
+        """A cache stored as one JSON object is converted to lines in place."""
+        path = tmp_path / "cache.json"
+        path.write_text(json.dumps({"a": [1], "b": {"x": "ä"}}, indent=4))
+
+        cache = CacheManager(path)
+        assert cache.get("a") == [1]
+        assert cache.get("b") == {"x": "ä"}
+        assert [json.loads(line) for line in path.read_text().splitlines()] == [
+            ["a", [1]],
+            ["b", {"x": "ä"}],
+        ]
+
+        cache.set("c", 2)
+        reopened = CacheManager(path)
+        assert reopened.get("a") == [1]
+        assert reopened.get("c") == 2
+
+    def test_skips_torn_and_malformed_lines(self, tmp_path):
+        """A partially written last line and lines that are not entries are skipped."""
+        path = tmp_path / "cache.json"
+        path.write_text('["a", 1]\n{}\n7\n[1, 2, 3]\n\n["b", 2]\n["c", [1, ')
+
+        cache = CacheManager(path)
+        assert cache.get("a") == 1
+        assert cache.get("b") == 2
+        assert cache.get("c") is None
+
+        # New entries start on their own line after the torn one.
+        cache.set("d", 4)
+        reopened = CacheManager(path)
+        assert reopened.get("a") == 1
+        assert reopened.get("d") == 4
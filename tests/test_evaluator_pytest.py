@@ -0,0 +1,334 @@
+"""Pytest tests for the evaluator helpers."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+from sklearn.metrics import precision_recall_fscore_support, roc_auc_score
+from torch.utils.data import DataLoader
+
+from lettucedetect.datasets.hallucination_dataset import HallucinationSample
+from lettucedetect.models.evaluator import (
+    _span_bounds,
+    _span_overlap_length,
+    _sweep_overlap,
+    binary_prf,
+    evaluate_detector_example_level,
+    evaluate_detector_example_level_batch,
+    evaluate_model,
+    evaluate_model_example_level,
+    evaluate_sentence_model,
+    print_metrics,
+)
+
+VOCAB_SIZE = 20
+SEQ_LEN = 6
+
+
+def nested_loop_overlap(predicted_spans: list[dict], gold_spans: list[dict]) -> int:
+    """Reference overlap: intersect every (predicted, gold) span pair."""
+    overlap = 0
+    for pred in predicted_spans:
+        for gold in gold_spans:
+            overlap += max(0, min(pred["end"], gold["end"]) - max(pred["start"], gold["start"]))
+    return overlap
+
+
+def random_spans(rng: np.random.Generator, max_spans: int = 6) -> list[dict]:
+    """Draw spans that may be nested, overlapping, touching, empty or inverted."""
+    spans = []
+    for _ in range(rng.integers(0, max_spans + 1)):
+        start = int(rng.integers(0, 50))
+        spans.append({"start": start, "end": start + int(rng.integers(-3, 20))})
+    return spans
+
+
+class TestBinaryPrf:
+    """Tests for binary_prf."""
+
+    @pytest.mark.parametrize(
+        "y_true, y_pred",
+        [
+            ([0, 0, 0, 0], [0, 1, 0, 1]),
+            ([1, 1, 1], [1, 0, 1]),
+            ([0, 1, 0, 1], [0, 0, 0, 0]),
+            ([0, 1, 1, 0], [1, 1, 1, 1]),
+            ([1, 1], [1, 1]),
+            ([0], [0]),
+        ],
+    )
+    def test_degenerate_label_sets(self, y_true, y_pred):
+        """Classes missing from the labels or the predictions score 0, like sklearn."""
+        expected = precision_recall_fscore_support(
+            y_true, y_pred, labels=[0, 1], average=None, zero_division=0
+        )[:3]
+        for actual, reference in zip(binary_prf(y_true, y_pred), expected):
+            np.testing.assert_allclose(actual, reference)
+
+    def test_matches_sklearn_on_random_labels(self):
+        """Random label sets give the same per-class scores as sklearn."""
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            size = int(rng.integers(1, 40))
+            y_true = rng.integers(0, 2, size)
+            y_pred = rng.integers(0, 2, size)
+            expected = precision_recall_fscore_support(
+                y_true, y_pred, labels=[0, 1], average=None, zero_division=0
+            )[:3]
+            for actual, reference in zip(binary_prf(y_true, y_pred), expected):
+                np.testing.assert_allclose(actual, reference)
+
+
+class TestSpanOverlapLength:
+    """Tests for _span_overlap_length."""
+
+    def test_examples(self):
+        """Nested, partial, touching and empty spans."""
+        gold = [{"start": 0, "end": 10}, {"start": 20, "end": 30}]
+        assert _span_overlap_length([{"start": 2, "end": 5}], gold) == 3
+        assert _span_overlap_length([{"start": 5, "end": 25}], gold) == 10
+        assert _span_overlap_length([{"start": 10, "end": 20}], gold) == 0
+        assert _span_overlap_length([{"start": 4, "end": 4}], gold) == 0
+        assert _span_overlap_length([], gold) == 0
+
+    def test_matches_nested_loop_on_random_spans(self):
+        """Random span sets overlap by the same amount as the pairwise loop."""
+        rng = np.random.default_rng(0)
+        for _ in range(1000):
+            predicted_spans, gold_spans = random_spans(rng), random_spans(rng)
+            expected = nested_loop_overlap(predicted_spans, gold_spans)
+            assert _span_overlap_length(predicted_spans, gold_spans) == expected
+
+            # The sweep is only used when numba is installed, so check it directly too.
+            pred_bounds, gold_bounds = _span_bounds(predicted_spans), _span_bounds(gold_spans)
+            if len(pred_bounds) and len(gold_bounds):
+                assert _sweep_overlap(pred_bounds, gold_bounds) == expected
+
+
+class FixedLogitTokenModel(nn.Module):
+    """Token classifier stub whose logits are a fixed lookup of the token ids."""
+
+    def __init__(self, table: torch.Tensor):
+        """Initialize the stub with a [vocab_size, 2] logit table."""
+        super().__init__()
+        self.table = table
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> SimpleNamespace:
+        """Return the logits of every token, shape [batch_size, seq_len, 2]."""
+        return SimpleNamespace(logits=self.table[input_ids])
+
+
+class FixedLogitSentenceModel(nn.Module):
+    """Sentence classifier stub that scores sentence i of a document by its i-th token id."""
+
+    def __init__(self, table: torch.Tensor):
+        """Initialize the stub with a [vocab_size, 2] logit table."""
+        super().__init__()
+        self.table = table
+
+    def forward(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        sentence_boundaries: list[list[tuple[int, int]]],
+    ) -> list[torch.Tensor]:
+        """Return the logits of every document, shape [num_sentences, 2] each."""
+        return [
+            self.table[ids[: len(boundaries)]]
+            for ids, boundaries in zip(input_ids, sentence_boundaries)
+        ]
+
+
+def sigmoid(x: np.ndarray) -> np.ndarray:
+    """Compute the logistic function."""
+    return 1 / (1 + np.exp(-x))
+
+
+@pytest.fixture
+def logit_table():
+    """Draw a fixed [vocab_size, 2] logit table."""
+    torch.manual_seed(0)
+    return torch.randn(VOCAB_SIZE, 2)
+
+
+@pytest.fixture
+def token_batches():
+    """Build token-level examples, with ignored tokens and one example without any labels."""
+    rng = np.random.default_rng(0)
+    examples = []
+    for i in range(7):
+        labels = rng.integers(0, 2, SEQ_LEN)
+        labels[rng.random(SEQ_LEN) < 0.3] = -100
+        if i == 4:
+            labels[:] = -100
+        examples.append(
+            {
+                "input_ids": torch.tensor(rng.integers(0, VOCAB_SIZE, SEQ_LEN)),
+                "attention_mask": torch.ones(SEQ_LEN, dtype=torch.long),
+                "labels": torch.tensor(labels),
+            }
+        )
+    return examples
+
+
+class TestEvaluateModel:
+    """Tests for the model evaluators, with fixed logits on the CPU."""
+
+    def test_token_level_auroc_uses_scores(self, logit_table, token_batches):
+        """Token AUROC ranks the hallucination probabilities of the labelled tokens."""
+        loader = DataLoader(token_batches, batch_size=3)
+        results = evaluate_model(
+            FixedLogitTokenModel(logit_table), loader, torch.device("cpu"), verbose=False
+        )
+
+        input_ids = torch.stack([example["input_ids"] for example in token_batches])
+        labels = torch.stack([example["labels"] for example in token_batches]).numpy()
+        logits = logit_table[input_ids].numpy()
+        mask = labels != -100
+        margin = (logits[..., 1] - logits[..., 0])[mask]
+        assert results["auroc"] == pytest.approx(roc_auc_score(labels[mask], sigmoid(margin)))
+
+        precision, recall, f1 = binary_prf(labels[mask], (margin > 0).astype(int))
+        assert results["hallucinated"]["precision"] == pytest.approx(precision[1])
+        assert results["hallucinated"]["recall"] == pytest.approx(recall[1])
+        assert results["supported"]["f1"] == pytest.approx(f1[0])
+
+    def test_example_level_auroc_uses_max_scores(self, logit_table, token_batches):
+        """Example AUROC ranks the highest token probability of each example."""
+        loader = DataLoader(token_batches, batch_size=3)
+        results = evaluate_model_example_level(
+            FixedLogitTokenModel(logit_table), loader, torch.device("cpu"), verbose=False
+        )
+
+        example_labels, example_preds, example_probs = [], [], []
+        for example in token_batches:
+            logits = logit_table[example["input_ids"]].numpy()
+            mask = example["labels"].numpy() != -100
+            margin = (logits[:, 1] - logits[:, 0])[mask]
+            example_labels.append(int((example["labels"].numpy()[mask] == 1).any()))
+            example_preds.append(int((margin > 0).any()))
+            example_probs.append(float(sigmoid(margin.max())) if mask.any() else 0.0)
+
+        assert results["auroc"] == pytest.approx(roc_auc_score(example_labels, example_probs))
+        precision, recall, f1 = binary_prf(example_labels, example_preds)
+        assert results["hallucinated"]["precision"] == pytest.approx(precision[1])
+        assert results["hallucinated"]["recall"] == pytest.approx(recall[1])
+        assert results["supported"]["f1"] == pytest.approx(f1[0])
+
+    def test_sentence_level_auroc_uses_scores(self, logit_table):
+        """Sentence AUROC ranks the hallucination probabilities of all sentences."""
+        rng = np.random.default_rng(1)
+        documents = []
+        for num_sentences in [3, 1, 0, 4, 2, 3, 2]:
+            documents.append(
+                {
+                    "input_ids": torch.tensor(rng.integers(0, VOCAB_SIZE, SEQ_LEN)),
+                    "attention_mask": torch.ones(SEQ_LEN, dtype=torch.long),
+                    "sentence_boundaries": [(j, j + 1) for j in range(num_sentences)],
+                    "labels": torch.tensor(rng.integers(0, 2, num_sentences)),
+                }
+            )
+
+        def collate(batch: list[dict]) -> dict:
+            return {
+                "input_ids": torch.stack([document["input_ids"] for document in batch]),
+                "attention_mask": torch.stack([document["attention_mask"] for document in batch]),
+                "sentence_boundaries": [document["sentence_boundaries"] for document in batch],
+                "labels": [document["labels"] for document in batch],
+            }
+
+        loader = DataLoader(documents, batch_size=3, collate_fn=collate)
+        results = evaluate_sentence_model(
+            FixedLogitSentenceModel(logit_table),
+            loader,
+            torch.device("cpu"),
+            nn.CrossEntropyLoss(),
+            verbose=False,
+        )
+
+        labels = np.concatenate([document["labels"].numpy() for document in documents])
+        logits = np.concatenate(
+            [
+                logit_table[document["input_ids"][: len(document["labels"])]].numpy()
+                for document in documents
+            ]
+        )
+        margin = logits[:, 1] - logits[:, 0]
+        assert results["auroc"] == pytest.approx(roc_auc_score(labels, sigmoid(margin)))
+        assert results["accuracy"] == pytest.approx(np.mean(labels == (margin > 0)))
+        precision, recall, f1 = binary_prf(labels, (margin > 0).astype(int))
+        assert results["hallucinated"]["precision"] == pytest.approx(precision[1])
+        assert results["hallucinated"]["recall"] == pytest.approx(recall[1])
+        assert results["supported"]["f1"] == pytest.approx(f1[0])
+
+
+class SubstringDetector:
+    """Detector stub that flags every answer containing "wrong"."""
+
+    def predict_prompt(self, prompt: str, answer: str, output_format: str) -> list[dict]:
+        """Return one span for a flagged answer, none otherwise."""
+        start = answer.find("wrong")
+        return [] if start < 0 else [{"start": start, "end": start + 5, "text": "wrong"}]
+
+    def predict_prompt_batch(
+        self, prompts: list[str], answers: list[str], output_format: str
+    ) -> list[list[dict]]:
+        """Return the predictions of every input, in the input order."""
+        return [
+            self.predict_prompt(prompt, answer, output_format)
+            for prompt, answer in zip(prompts, answers)
+        ]
+
+
+class TestEvaluateDetector:
+    """Tests for the detector evaluators."""
+
+    def test_batches_match_single_predictions(self, capsys):
+        """Length-sorted batches score every sample like the per-sample loop, without AUROC."""
+        answers = [
+            "a long answer that is wrong in the end",
+            "fine",
+            "wrong",
+            "a fine answer",
+            "also fine, but longer than the others",
+            "short and wrong",
+            "ok",
+        ]
+        gold = [[{"start": 0, "end": 1}], [], [], [], [{"start": 0, "end": 1}], [], []]
+        samples = [
+            HallucinationSample("prompt " * (i % 3), answer, labels, "test", "qa", "ragtruth", "en")
+            for i, (answer, labels) in enumerate(zip(answers, gold))
+        ]
+        detector = SubstringDetector()
+
+        batched = evaluate_detector_example_level_batch(
+            detector, samples, batch_size=3, verbose=False
+        )
+        single = evaluate_detector_example_level(detector, samples, verbose=False)
+
+        precision, recall, f1 = binary_prf(
+            [1 if labels else 0 for labels in gold],
+            [1 if "wrong" in answer else 0 for answer in answers],
+        )
+        for results in (batched, single):
+            assert "auroc" not in results
+            assert results["hallucinated"]["precision"] == pytest.approx(precision[1])
+            assert results["hallucinated"]["recall"] == pytest.approx(recall[1])
+            assert results["supported"]["f1"] == pytest.approx(f1[0])
+
+        print_metrics(batched)
+        output = capsys.readouterr().out
+        assert "Precision" in output
+        assert "AUROC" not in output
+
+    def test_print_metrics_with_auroc(self, capsys):
+        """AUROC is printed when the results have it."""
+        metrics = {
+            "supported": {"precision": 1.0, "recall": 0.5, "f1": 2 / 3},
+            "hallucinated": {"precision": 0.5, "recall": 1.0, "f1": 2 / 3},
+            "auroc": 0.75,
+        }
+        print_metrics(metrics)
+        assert "AUROC: 0.7500" in capsys.readouterr().out
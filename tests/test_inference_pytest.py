@@ -4,6 +4,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 import torch
+from transformers import BertConfig, BertForTokenClassification, BertTokenizerFast
 
 from lettucedetect.detectors.prompt_utils import PromptUtils
 from lettucedetect.detectors.transformer import TransformerDetector
@@ -127,6 +128,23 @@ class TestTransformerDetector:
         assert detector.model == self.mock_model
         assert detector.max_length == 4096
 
+    def test_init_with_attn_implementation(self):
+        """Test that an explicit attention implementation is passed to the model only."""
+        TransformerDetector(model_path="dummy_path", attn_implementation="flash_attention_2")
+
+        self.mock_tokenizer_cls.assert_called_once_with("dummy_path")
+        self.mock_model_cls.assert_called_once_with(
+            "dummy_path", attn_implementation="flash_attention_2"
+        )
+
+    def test_init_with_string_device(self):
+        """Test that a device given as a string is converted to a torch.device."""
+        detector = TransformerDetector(model_path="dummy_path", device="cpu")
+
+        assert detector.device == torch.device("cpu")
+        assert detector.dtype == torch.float32
+        self.mock_model.to.assert_called_once_with(torch.device("cpu"), dtype=torch.float32)
+
     def test_predict(self):
         """Test predict method."""
 
@@ -175,3 +193,154 @@ class TestTransformerDetector:
         # Check that the prompt contains the text to summarize
         assert "This is a text to summarize." in prompt
         assert "Summarize" in prompt
+
+
+TINY_VOCAB = (
+    ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"]
+    + "the a is of in paris capital france berlin germany city river passage question".split()
+    + list("abcdefghijklmnopqrstuvwxyz.,:?")
+)
+
+
+@pytest.fixture(scope="module")
+def tiny_model_path(tmp_path_factory):
+    """Save a small randomly initialised BERT token classifier with its tokenizer."""
+    path = tmp_path_factory.mktemp("tiny_bert")
+    (path / "vocab.txt").write_text("\n".join(TINY_VOCAB))
+    tokenizer = BertTokenizerFast(str(path / "vocab.txt"))
+    torch.manual_seed(0)
+    model = BertForTokenClassification(
+        BertConfig(
+            vocab_size=len(TINY_VOCAB),
+            hidden_size=16,
+            num_hidden_layers=1,
+            num_attention_heads=2,
+            intermediate_size=32,
+            num_labels=2,
+            max_position_embeddings=128,
+        )
+    )
+    # Spread the logits so padding noise can not flip a prediction.
+    with torch.no_grad():
+        model.classifier.weight.mul_(20)
+    tokenizer.save_pretrained(path)
+    model.save_pretrained(path)
+    return str(path)
+
+
+class TestTransformerDetectorTinyModel:
+    """Tests for TransformerDetector with a real tokenizer and model."""
+
+    prompts = [
+        "passage: paris is the capital of france.",
+        "question: the river?",
+        "passage: berlin is a city in germany. the river is old.",
+        "a",
+        "passage: the capital",
+    ]
+    answers = [
+        "paris is the capital of germany.",
+        "the river is paris",
+        "berlin",
+        "a city in france",
+        "the capital of the river is berlin, germany.",
+    ]
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tiny_model_path):
+        """Load the detector with batches smaller than the inputs."""
+        self.detector = TransformerDetector(
+            tiny_model_path, max_length=128, device="cpu", batch_size=2
+        )
+
+    @pytest.mark.parametrize("output_format", ["tokens", "spans"])
+    def test_predict_prompt_batch_matches_predict_prompt(self, output_format):
+        """Batched predictions equal the per-sample ones, in the input order."""
+        batch = self.detector.predict_prompt_batch(self.prompts, self.answers, output_format)
+        single = [
+            self.detector.predict_prompt(prompt, answer, output_format)
+            for prompt, answer in zip(self.prompts, self.answers)
+        ]
+
+        assert len(batch) == len(single)
+        key = "pred" if output_format == "tokens" else "text"
+        for batch_result, single_result in zip(batch, single):
+            assert [item[key] for item in batch_result] == [item[key] for item in single_result]
+            probabilities = "prob" if output_format == "tokens" else "confidence"
+            assert [item[probabilities] for item in batch_result] == pytest.approx(
+                [item[probabilities] for item in single_result], abs=1e-5
+            )
+        # The spans of every input are substrings of its own answer.
+        if output_format == "spans":
+            assert any(batch)
+            for answer, spans in zip(self.answers, batch):
+                for span in spans:
+                    assert answer[span["start"] : span["end"]] == span["text"]
+
+    @pytest.mark.parametrize("output_format", ["tokens", "spans"])
+    def test_empty_answer(self, output_format):
+        """An empty answer has nothing to predict, alone or in a batch."""
+        assert self.detector.predict_prompt(self.prompts[0], "", output_format) == []
+
+        results = self.detector.predict_prompt_batch(
+            self.prompts[:3], ["", self.answers[1], ""], output_format
+        )
+        assert results[0] == []
+        assert results[2] == []
+        assert results[1] == self.detector.predict_prompt(
+            self.prompts[1], self.answers[1], output_format
+        )
+
+    def test_spans_skip_zero_length_tokens(self):
+        """Special tokens neither start nor break a span, nor count for its confidence."""
+        answer = "paris is old"
+        offsets = torch.tensor([[0, 5], [0, 0], [6, 8], [9, 12], [0, 0]])
+        token_preds = torch.tensor([1, 1, 1, 0, 1])
+        probabilities = torch.tensor([0.6, 0.99, 0.7, 0.1, 0.99])
+
+        spans = TransformerDetector._to_spans(answer, offsets, token_preds, probabilities)
+
+        assert len(spans) == 1
+        assert spans[0]["start"] == 0
+        assert spans[0]["end"] == 8
+        assert spans[0]["text"] == "paris is"
+        assert spans[0]["confidence"] == pytest.approx(0.7)
+
+
+class TestTransformerDetectorOrt:
+    """Tests for TransformerDetector with the ONNX Runtime backend."""
+
+    @pytest.mark.parametrize("output_format", ["tokens", "spans"])
+    def test_ort_matches_torch(self, tiny_model_path, tmp_path, output_format):
+        """The exported model predicts the same as the PyTorch one, also when it is reloaded."""
+        pytest.importorskip("onnxruntime")
+        prompts, answers = (
+            TestTransformerDetectorTinyModel.prompts,
+            TestTransformerDetectorTinyModel.answers,
+        )
+        torch_detector = TransformerDetector(
+            tiny_model_path, max_length=128, device="cpu", batch_size=2
+        )
+        expected = torch_detector.predict_prompt_batch(prompts, answers, output_format)
+
+        onnx_path = tmp_path / "model.onnx"
+        for _ in range(2):
+            ort_detector = TransformerDetector(
+                tiny_model_path,
+                max_length=128,
+                device="cpu",
+                batch_size=2,
+                backend="ort",
+                onnx_path=str(onnx_path),
+            )
+            assert onnx_path.exists()
+            assert ort_detector.model.device == torch.device("cpu")
+            results = ort_detector.predict_prompt_batch(prompts, answers, output_format)
+
+            key = "pred" if output_format == "tokens" else "text"
+            probabilities = "prob" if output_format == "tokens" else "confidence"
+            for ort_result, torch_result in zip(results, expected):
+                assert [item[key] for item in ort_result] == [item[key] for item in torch_result]
+                assert [item[probabilities] for item in ort_result] == pytest.approx(
+                    [item[probabilities] for item in torch_result], abs=1e-5
+                )
@@ -0,0 +1,82 @@
+"""Pytest tests for the RAGAS baseline script."""
+
+import pytest
+
+for module in ("aiolimiter", "httpx", "langchain_community", "orjson", "ragas"):
+    pytest.importorskip(module)
+
+import json  # noqa: E402
+import math  # noqa: E402
+
+from lettucedetect.datasets.hallucination_dataset import HallucinationSample  # noqa: E402
+from scripts.ragas_baseline import load_check_existing_data, split_prompt  # noqa: E402
+
+
+def make_sample(prompt: str, task_type: str) -> HallucinationSample:
+    """Create a test sample with the given prompt and task type."""
+    return HallucinationSample(prompt, "answer", [], "test", task_type, "ragtruth", "en")
+
+
+class TestSplitPrompt:
+    """Tests for split_prompt."""
+
+    def test_summary_splits_after_first_colon(self):
+        """Summary prompts keep the instruction as the user input."""
+        sample = make_sample("Summarize the following news:\nThe text: with a colon", "Summary")
+        assert split_prompt(sample) == (
+            "Summarize the following news",
+            ["\nThe text", " with a colon"],
+        )
+
+    def test_qa_splits_after_second_colon(self):
+        """QA prompts join the instruction and the question as the user input."""
+        sample = make_sample("Briefly answer: question: Who?\npassages: some text", "QA")
+        assert split_prompt(sample) == (
+            "Briefly answer  question",
+            [" Who?\npassages", " some text"],
+        )
+
+    def test_prompt_without_colon(self):
+        """The task type is the user input and the whole prompt is the only context."""
+        sample = make_sample("No separator in this prompt", "Summary")
+        user_input, retrieved_contexts = split_prompt(sample)
+        assert user_input == "Summary"
+        assert retrieved_contexts == ["No separator in this prompt"]
+
+
+class TestLoadCheckExistingData:
+    """Tests for load_check_existing_data."""
+
+    def test_skips_malformed_checkpoint_lines(self, tmp_path):
+        """Lines that are not sample objects are skipped, the samples around them are kept."""
+        output_file = tmp_path / "baseline.json"
+        sample = make_sample("passage: text", "QA")
+        lines = [
+            json.dumps(sample.to_json()).encode(),
+            b"7",
+            b"[]",
+            b'"x"',
+            b"",
+            b'{"prompt": "torn',
+            json.dumps(make_sample("other", "Summary").to_json()).encode(),
+        ]
+        output_file.with_suffix(".jsonl").write_bytes(b"\n".join(lines))
+
+        samples = load_check_existing_data(output_file).samples
+        assert [s.prompt for s in samples] == ["passage: text", "other"]
+
+    def test_skips_malformed_output_file(self, tmp_path):
+        """An output file that is not a list of samples counts as empty."""
+        output_file = tmp_path / "baseline.json"
+        output_file.write_bytes(b"7")
+        assert load_check_existing_data(output_file).samples == []
+
+    def test_keeps_nan_faithfulness(self, tmp_path):
+        """A NaN faithfulness, for answers without statements, survives the output file."""
+        output_file = tmp_path / "baseline.json"
+        sample = make_sample("passage: text", "QA")
+        sample.labels = [{"faithfulness": float("nan"), "threshold_0.5": 0}]
+        output_file.write_text(json.dumps([sample.to_json()], indent=4))
+
+        (loaded,) = load_check_existing_data(output_file).samples
+        assert math.isnan(loaded.labels[0]["faithfulness"])